@@ -0,0 +1,59 @@
+import os
+from collections import OrderedDict
+
+import cv2
+import pygame
+
+
+def load_surface(image_path, size):
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+
+    resized_image = cv2.resize(image, size)
+    image_rgb = cv2.cvtColor(resized_image, cv2.COLOR_BGR2RGB)
+    image_surface = pygame.surfarray.make_surface(image_rgb)
+
+    # Flip the image surface vertically
+    return pygame.transform.flip(image_surface, False, True)
+
+
+class AssetCache:
+    # Display-ready surfaces keyed by (name, size), least recently used evicted first
+    def __init__(self, image_dir='.', max_items=64):
+        self.image_dir = image_dir
+        self.max_items = max_items
+        self.surfaces = OrderedDict()
+        self.missing = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, size=(500, 500)):
+        key = (name, tuple(size))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if name in self.missing:
+            return None
+        surface = load_surface(os.path.join(self.image_dir, name), key[1])
+        if surface is None:
+            self.missing.add(name)
+            return None
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            surface = surface.convert()
+
+        self.surfaces[key] = surface
+        while len(self.surfaces) > self.max_items:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def preload(self, names, size=(500, 500)):
+        # Returns the names that could not be loaded so callers can report them up front
+        missing = [name for name in names if self.get(name, size) is None]
+        for name in missing:
+            print(f"Error loading image {name}: not found or unreadable in '{self.image_dir}'")
+        return missing
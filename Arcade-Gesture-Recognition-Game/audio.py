@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+
+import pygame
+
+from instrumentation import RollingHistogram
+
+FREQUENCY = 44100
+# Samples per mixer buffer; SDL's default of 4096 alone adds ~90 ms before a cue is heard at 44.1 kHz
+BUFFER = 512
+
+
+def configure_mixer(frequency=FREQUENCY, buffer=BUFFER):
+    # Must run before pygame.init()/pygame.mixer.init() to take effect
+    pygame.mixer.pre_init(frequency, -16, 2, buffer)
+
+
+class AudioEngine:
+    # Short sound cues played on a pool of reserved mixer channels. Every cue is decoded to PCM
+    # once by load(); play() only queues the request, so it never blocks and is safe from any
+    # thread. A dispatcher thread starts the cue on a free channel (or the one that has been
+    # playing longest when all are busy) and records the request-to-start time.
+    def __init__(self, cues, channels=4, buffer=BUFFER):
+        self.cues = cues
+        self.sounds = {}
+        self.channel_count = channels
+        self.buffer = buffer
+        self.latency = RollingHistogram(1000)
+        self.requests = queue.SimpleQueue()
+        self.channels = []
+        self.started = []
+        self.stats = {'played': 0, 'skipped': 0, 'stolen': 0}
+        self.thread = None
+
+    def load(self):
+        # Decodes every cue; run on a background thread at startup. Cues become playable one by one.
+        if pygame.mixer.get_num_channels() < self.channel_count:
+            pygame.mixer.set_num_channels(self.channel_count)
+        pygame.mixer.set_reserved(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self.started = [0.0] * self.channel_count
+        for name, path in self.cues.items():
+            self.sounds[name] = pygame.mixer.Sound(path)
+        return self
+
+    def start(self):
+        self.thread = threading.Thread(target=self._dispatch, name='audio', daemon=True)
+        self.thread.start()
+        return self
+
+    def play(self, name):
+        self.requests.put((name, time.perf_counter()))
+
+    def stop(self):
+        if self.thread:
+            self.requests.put(None)
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def _dispatch(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            name, requested = request
+            sound = self.sounds.get(name)
+            if sound is None or not self.channels:
+                # Not decoded yet (or unknown); a late cue is worse than a missing one
+                self.stats['skipped'] += 1
+                continue
+            index = self._free_channel()
+            self.channels[index].play(sound)
+            self.started[index] = time.perf_counter()
+            self.stats['played'] += 1
+            self.latency.add(self.started[index] - requested)
+
+    def _free_channel(self):
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        self.stats['stolen'] += 1
+        return min(range(len(self.channels)), key=self.started.__getitem__)
+
+    def audioStats(self):
+        # Only dispatch latency is measured. modelled_p95_ms is not a measurement: it assumes the mixer
+        # adds at most two buffers before the cue is audible, and nothing after it (driver, DAC).
+        frequency = (pygame.mixer.get_init() or (FREQUENCY,))[0]
+        buffer_ms = 1000 * self.buffer / frequency
+        p50, p95 = (1000 * float(p) for p in self.latency.percentiles((50, 95)))
+        return dict(self.stats, buffer=self.buffer, buffer_ms=buffer_ms, dispatch_p50_ms=p50, dispatch_p95_ms=p95,
+                    modelled_p95_ms=p95 + 2 * buffer_ms)
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Headless: SDL's dummy audio driver mixes on the same schedule without a sound card
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, GAME_DIR)
+
+from audio import AudioEngine, configure_mixer  # noqa: E402
+from main import SOUNDS  # noqa: E402
+
+
+def mean_ms(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return 1000 * (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cue latency of the audio engine at different mixer buffer sizes, '
+                                                 'against the old load-per-beep and decode-at-import paths')
+    parser.add_argument('--buffers', type=int, nargs='+', default=[256, 512, 1024, 4096])
+    parser.add_argument('--cues', type=int, default=200, help='cues requested per buffer size')
+    parser.add_argument('--threads', type=int, default=4, help='threads requesting cues at once')
+    parser.add_argument('--channels', type=int, default=4, help='reserved mixer channels')
+    parser.add_argument('--interval', type=float, default=0.01, help='seconds between one thread\'s requests')
+    args = parser.parse_args()
+    os.chdir(GAME_DIR)
+
+    configure_mixer()
+    pygame.mixer.init()
+    load_and_play = mean_ms(lambda: (pygame.mixer.music.load(SOUNDS['beep']), pygame.mixer.music.play()), 20)
+    decode_all = mean_ms(lambda: [pygame.mixer.Sound(path) for path in SOUNDS.values()], 3)
+    print("Old paths, blocking the game loop:")
+    print(f"  mixer.music.load + play per beep  {load_and_play:8.2f} ms")
+    print(f"  decoding every cue at startup     {decode_all:8.2f} ms")
+    pygame.mixer.music.stop()
+    pygame.mixer.quit()
+
+    print(f"\n{'buffer':>6} {'buffer ms':>9} {'play() us':>9} {'dispatch p50':>12} {'p95 ms':>7} "
+          f"{'model p95 ms':>12} {'played':>6} {'stolen':>6}")
+    for buffer in args.buffers:
+        configure_mixer(buffer=buffer)
+        pygame.mixer.init()
+        audio = AudioEngine(SOUNDS, channels=args.channels, buffer=buffer).load().start()
+        per_thread = args.cues // args.threads
+        request_times = []
+
+        def requester():
+            for _ in range(per_thread):
+                start = time.perf_counter()
+                audio.play('beep')
+                request_times.append(time.perf_counter() - start)
+                time.sleep(args.interval)
+
+        threads = [threading.Thread(target=requester) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        audio.stop()
+        stats = audio.audioStats()
+        print(f"{buffer:>6} {stats['buffer_ms']:>9.1f} {1e6 * sum(request_times) / len(request_times):>9.1f} "
+              f"{stats['dispatch_p50_ms']:>12.3f} {stats['dispatch_p95_ms']:>7.3f} {stats['modelled_p95_ms']:>12.1f} "
+              f"{stats['played']:>6} {stats['stolen']:>6}")
+        pygame.mixer.quit()
+    print("\nmodel p95 = dispatch p95 + two mixer buffers, a model of when the cue is audible rather than a "
+          "measurement at the sound card")
+
+
+if __name__ == '__main__':
+    main()
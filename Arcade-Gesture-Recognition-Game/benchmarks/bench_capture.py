@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from capture import FrameGrabber, SyntheticSource  # noqa: E402
+
+
+def consume(read, timestamp, frames, work):
+    # A game loop that spends `work` seconds on every frame; returns each frame's age when read
+    ages = []
+    out = None
+    for _ in range(frames):
+        success, out = read(out)
+        if not success:
+            break
+        ages.append(time.perf_counter() - timestamp())
+        time.sleep(work)
+    return np.array(ages) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Frame age with and without the latest-frame grabber when the '
+                                                 'game loop is slower than the camera')
+    parser.add_argument('--fps', type=float, default=30.0, help='camera frame rate')
+    parser.add_argument('--buffer', type=int, default=4, help='frames the camera driver queues')
+    parser.add_argument('--frames', type=int, default=60, help='frames read per run')
+    parser.add_argument('--work', type=float, nargs='+', default=[0.01, 0.033, 0.05, 0.1],
+                        help='seconds the loop spends on each frame')
+    parser.add_argument('--size', type=int, nargs=2, default=[640, 480], metavar=('WIDTH', 'HEIGHT'))
+    args = parser.parse_args()
+
+    size = tuple(args.size)
+    print(f"{args.size[0]}x{args.size[1]} at {args.fps:g} fps, driver queue of {args.buffer} frames")
+    print(f"{'work ms':>7} {'direct p50':>10} {'p95 ms':>7} {'lost':>5} {'grabber p50':>11} {'p95 ms':>7} "
+          f"{'dropped':>7} {'late':>5}")
+    for work in args.work:
+        direct = SyntheticSource(size, args.fps, buffer=args.buffer)
+        direct_ages = consume(direct.read, lambda: direct.timestamp, args.frames, work)
+        grabber = FrameGrabber(SyntheticSource(size, args.fps, buffer=args.buffer)).start()
+        grabbed_ages = consume(grabber.read, lambda: grabber.timestamp, args.frames, work)
+        grabber.release()
+        stats = grabber.captureStats()
+        print(f"{1000 * work:>7.0f} {np.percentile(direct_ages, 50):>10.1f} {np.percentile(direct_ages, 95):>7.1f} "
+              f"{direct.lost:>5} {np.percentile(grabbed_ages, 50):>11.1f} {np.percentile(grabbed_ages, 95):>7.1f} "
+              f"{stats['dropped']:>7} {stats['late']:>5}")
+
+
+if __name__ == '__main__':
+    main()
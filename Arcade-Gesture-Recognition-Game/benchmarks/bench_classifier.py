@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from classifier import HeuristicClassifier, KNNClassifier, MLPClassifier, NearestCentroidClassifier  # noqa: E402
+from gestures import PREDEFINED_GESTURES, GestureTable  # noqa: E402
+from synthetic_hands import synthetic_dataset  # noqa: E402
+
+# Held-out conditions: (max rotation in degrees, share of left hands)
+CONDITIONS = {
+    'upright right hands': (10, 0.0),
+    'rotated up to 45 deg': (45, 0.0),
+    'left hands': (10, 1.0),
+    'rotated left hands': (45, 1.0),
+    'up to 90 deg, mixed': (90, 0.5),
+}
+
+
+def per_hand_us(fn, hands, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return 1e6 * (time.perf_counter() - start) / (repeats * hands)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accuracy and latency of learned landmark classifiers against '
+                                                 'the finger-rule heuristic on the bundled gesture set')
+    parser.add_argument('--train', type=int, default=200, help='training hands per gesture')
+    parser.add_argument('--test', type=int, default=200, help='test hands per gesture and condition')
+    parser.add_argument('--batch', type=int, default=4096, help='hands per batch for the throughput column')
+    parser.add_argument('--repeats', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Training data covers rotations and both hands; the heuristic has nothing to train
+    train = synthetic_dataset(PREDEFINED_GESTURES, args.train, rng, max_angle=90, left_fraction=0.5)
+    models = {
+        'heuristic': HeuristicClassifier(GestureTable(PREDEFINED_GESTURES)),
+        'centroid': NearestCentroidClassifier(),
+        'knn': KNNClassifier(k=5),
+        'mlp': MLPClassifier(),
+    }
+    for name, model in models.items():
+        if hasattr(model, 'fit'):
+            start = time.perf_counter()
+            model.fit(*train)
+            print(f"trained {name} on {len(train[1])} hands in {time.perf_counter() - start:.2f}s")
+
+    tests = {label: synthetic_dataset(PREDEFINED_GESTURES, args.test, rng, max_angle=angle, left_fraction=left)
+             for label, (angle, left) in CONDITIONS.items()}
+    batch = synthetic_dataset(PREDEFINED_GESTURES, -(-args.batch // len(PREDEFINED_GESTURES)), rng, max_angle=45)
+
+    header = ''.join(f"{label:>22}" for label in CONDITIONS)
+    print(f"\n{'model':<10}{header} {'us/frame':>9} {'us/hand batched':>16}")
+    for name, model in models.items():
+        accuracy = ''.join(f"{np.mean(model.predict(landmarks, handedness) == labels):>22.1%}"
+                           for landmarks, labels, handedness in tests.values())
+        one = batch[0][:1], batch[2][:1]
+        single = per_hand_us(lambda: model.predict(*one), 1, args.repeats)
+        batched = per_hand_us(lambda: model.predict(batch[0], batch[2]), len(batch[1]), max(args.repeats // 100, 3))
+        print(f"{name:<10}{accuracy} {single:>9.1f} {batched:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
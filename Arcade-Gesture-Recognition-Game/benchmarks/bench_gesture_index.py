@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from classifier import landmark_features  # noqa: E402
+from gesture_index import ReferenceIndex, build_index  # noqa: E402
+from gestures import PREDEFINED_GESTURES, load_library  # noqa: E402
+from synthetic_hands import synthetic_dataset  # noqa: E402
+
+
+def per_call_us(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return 1e6 * (time.perf_counter() - start) / repeats
+
+
+def loop_match(references, features):
+    # One distance per reference in Python, as a per-gesture comparison would do
+    best = None, np.inf
+    for name, reference in references:
+        distance = float(((features - reference) ** 2).sum())
+        if distance < best[1]:
+            best = name, distance
+    return best[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup cost of the gesture reference index with and without '
+                                                 'its cache, and match latency as the library grows')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 100, 500, 2000], help='references in the index')
+    parser.add_argument('--repeats', type=int, default=500)
+    args = parser.parse_args()
+
+    library = load_library()
+    with tempfile.TemporaryDirectory() as cache:
+        for label in ('cold cache', 'warm cache'):
+            start = time.perf_counter()
+            index, stats = build_index(library, cache_dir=cache)
+            print(f"build_index, {label}: {1000 * (time.perf_counter() - start):8.1f} ms "
+                  f"({stats['images']} images, {stats['extracted']} extracted, {stats['cached']} cached, "
+                  f"{len(index)} with a hand)")
+
+    # The bundled images are drawings MediaPipe finds no hand in, so large libraries are made of
+    # synthetic hands: several rotated variants per finger pattern
+    rng = np.random.default_rng(0)
+    print(f"\n{'references':>10} {'index us/hand':>13} {'batch of 4 us/hand':>18} {'python loop us/hand':>19}")
+    for size in args.sizes:
+        per_gesture = -(-size // len(PREDEFINED_GESTURES))
+        landmarks, labels, handedness = synthetic_dataset(PREDEFINED_GESTURES, per_gesture, rng, max_angle=45)
+        features = landmark_features(landmarks, handedness)[:size]
+        index = ReferenceIndex(labels[:size], features)
+        references = list(zip(labels[:size], features))
+        query = synthetic_dataset(PREDEFINED_GESTURES, 1, rng, max_angle=45)
+        one = query[0][:1], query[2][:1]
+        four = query[0][:4], query[2][:4]
+        single = per_call_us(lambda: index.predict(*one), args.repeats)
+        batched = per_call_us(lambda: index.predict(*four), args.repeats) / 4
+        looped = per_call_us(lambda: loop_match(references, landmark_features(*one)[0]), max(args.repeats // 10, 5))
+        print(f"{size:>10} {single:>13.1f} {batched:>18.1f} {looped:>19.1f}")
+
+
+if __name__ == '__main__':
+    main()
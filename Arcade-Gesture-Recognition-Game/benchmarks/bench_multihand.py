@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gestures import PREDEFINED_GESTURES, GestureTable, encode_fingers  # noqa: E402
+from hand_detector import HandDetector, fingers_up  # noqa: E402
+from hand_tracking import HandTracker  # noqa: E402
+from replay import open_source  # noqa: E402
+from synthetic_hands import SyntheticResults, make_hand  # noqa: E402
+
+
+def mean_time(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def inference_by_hands(sources, max_hands, warmup, max_frames):
+    # MediaPipe on recorded frames -> {hands found: [seconds per frame]}. The frames are fed in order
+    # through a video-mode detector as the game does, so the cost includes its hand tracking. The
+    # first `warmup` frames of each source only warm the graph up.
+    detector = HandDetector(maxHands=max_hands)
+    times = {}
+    for source in sources:
+        for index, (timestamp, img) in enumerate(open_source(source)):
+            if max_frames and index >= max_frames:
+                break
+            start = time.perf_counter()
+            detector.findHands(img, draw=False, timestamp=timestamp)
+            elapsed = time.perf_counter() - start
+            if index >= warmup:
+                times.setdefault(len(detector.results.multi_hand_landmarks or []), []).append(elapsed)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-frame cost as the number of hands grows')
+    parser.add_argument('sources', nargs='*',
+                        help='videos, image directories or globs with one and two real hands in view, '
+                             'e.g. recorded at the cabinet; MediaPipe is only timed on these')
+    parser.add_argument('--max-hands', type=int, default=4)
+    parser.add_argument('--repeats', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=10, help='untimed frames at the start of each source')
+    parser.add_argument('--max-frames', type=int, default=0, help='frames read per source, 0 for all')
+    args = parser.parse_args()
+
+    inference = {}
+    if args.sources:
+        for hands, samples in sorted(inference_by_hands(args.sources, args.max_hands, args.warmup,
+                                                        args.max_frames).items()):
+            inference[hands] = float(np.median(samples))
+            print(f"{hands} hands found in {len(samples)} frames: inference p50 {1e3 * inference[hands]:.2f} ms, "
+                  f"p95 {1e3 * np.percentile(samples, 95):.2f} ms")
+        missing = [hands for hands in (1, 2) if hands not in inference]
+        if missing:
+            print(f"No frames with {' or '.join(map(str, missing))} hands in the recordings")
+    else:
+        print("No recordings given: only post-processing is timed. MediaPipe's cost depends on what is in "
+              "the frame, so time it on video with real hands in view.")
+    print()
+
+    # Landmark extraction, handedness-aware classification, lookup and tracking for N hands. These
+    # only depend on the landmark count, so synthetic MediaPipe results stand in for real ones.
+    rng = np.random.default_rng(0)
+    table = GestureTable(PREDEFINED_GESTURES)
+    patterns = list(PREDEFINED_GESTURES.values())
+    img = np.full((480, 640, 3), 90, dtype=np.uint8)
+    print(f"{'hands':>5} {'inference ms':>13} {'post ms':>8} {'frame ms':>9} {'ms/player':>10}")
+    for hands in range(1, args.max_hands + 1):
+        detector = HandDetector(maxHands=hands)
+        centres = [((i + 0.5) / hands, 0.6) for i in range(hands)]
+        results = SyntheticResults([make_hand(patterns[rng.integers(len(patterns))], center=c, scale=0.15)
+                                    for c in centres], ['Left', 'Right'] * hands)
+        tracker = HandTracker()
+
+        def post():
+            detector.results = results
+            landmarks = detector.findLandmarks(img, draw=False)
+            names = table.lookup_codes(encode_fingers(fingers_up(landmarks, detector.handedness)))
+            ids = tracker.update(landmarks, (img.shape[1], img.shape[0]))
+            return [(tracker.player_for(track_id, hands), name) for track_id, name in zip(ids, names)]
+
+        post_time = mean_time(post, args.repeats)
+        if hands in inference:
+            frame = inference[hands] + post_time
+            print(f"{hands:>5} {inference[hands] * 1e3:>13.2f} {post_time * 1e3:>8.3f} {frame * 1e3:>9.2f} "
+                  f"{frame / hands * 1e3:>10.2f}")
+        else:
+            print(f"{hands:>5} {'-':>13} {post_time * 1e3:>8.3f} {'-':>9} {'-':>10}")
+
+
+if __name__ == '__main__':
+    main()
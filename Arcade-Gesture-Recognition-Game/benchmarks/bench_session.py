@@ -0,0 +1,154 @@
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# Headless: SDL's dummy drivers stand in for the window and sound card
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, GAME_DIR)
+
+from assets import AssetCache  # noqa: E402
+from audio import AudioEngine  # noqa: E402
+from display import FrameRenderer  # noqa: E402
+from game import ATTRACT, CAPTURE, Game  # noqa: E402
+from gestures import IMAGE_TO_GESTURE, PREDEFINED_GESTURES, GestureTable  # noqa: E402
+from instrumentation import Instrumentation  # noqa: E402
+from main import SOUNDS  # noqa: E402
+from synthetic_hands import make_hand  # noqa: E402
+from telemetry import TelemetryWriter  # noqa: E402
+
+COUNTDOWN_IMAGES = ['3.jpg', '2.jpg', '1.jpg']
+FRAME_SIZE = (640, 480)
+
+
+class ScriptedCamera:
+    # Always the same frame, handed back in the caller's buffer like cv2.VideoCapture.read
+    def __init__(self):
+        self.frame = np.full((FRAME_SIZE[1], FRAME_SIZE[0], 3), 90, dtype=np.uint8)
+
+    def read(self, img=None):
+        if img is None:
+            img = self.frame.copy()
+        return True, img
+
+    def grab(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class ScriptedPlayer:
+    # Detector stand-in: holds up a hand on the attract screen, then makes each expected gesture in turn
+    def __init__(self, game):
+        self.game = game
+        scale = np.array([FRAME_SIZE[0], FRAME_SIZE[1], 1], dtype=np.float32)
+        self.hands = {name: make_hand(pattern)[None] * scale for name, pattern in PREDEFINED_GESTURES.items()}
+        self.no_hands = np.zeros((0, 21, 3), dtype=np.float32)
+        self.handedness = ['Left']
+        self.classifier = None
+
+    def detect(self, img, draw=True, timestamp=None, imgRGB=None):
+        game = self.game
+        if game.state == ATTRACT:
+            return self.hands['five']
+        if game.state == CAPTURE and len(game.captured_gestures) < len(game.expected_gestures):
+            return self.hands[game.expected_gestures[len(game.captured_gestures)]]
+        return self.no_hands
+
+
+class SteppedClock:
+    # Every reading moves time on by `step`, so hold times pass in a few frames without sleeping
+    def __init__(self, step):
+        self.step = step
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def resident_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        return float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory footprint of an attract-mode session over many rounds')
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--warmup-rounds', type=int, default=50, help='rounds played before the baseline is taken')
+    parser.add_argument('--report-every', type=int, default=250)
+    parser.add_argument('--step', type=float, default=0.25, help='simulated seconds per clock reading')
+    parser.add_argument('--max-growth-kb', type=float, default=256,
+                        help='fail if traced Python memory grows by more than this after warm-up')
+    parser.add_argument('--telemetry', metavar='PATH', help='also log the session to a telemetry file')
+    args = parser.parse_args()
+
+    telemetry_path = os.path.abspath(args.telemetry) if args.telemetry else None
+    os.chdir(GAME_DIR)
+    pygame.init()
+    win = pygame.display.set_mode((1440, 850))
+    assets = AssetCache('.')
+    missing = assets.preload(list(IMAGE_TO_GESTURE) + COUNTDOWN_IMAGES)
+    images = [name for name in IMAGE_TO_GESTURE if name not in missing]
+    audio = AudioEngine(SOUNDS).load().start()
+
+    timer = Instrumentation()
+    telemetry = TelemetryWriter(telemetry_path, 'bench').start() if telemetry_path else None
+    game = Game(win, assets, audio, ScriptedCamera(), None, GestureTable(PREDEFINED_GESTURES), images,
+                IMAGE_TO_GESTURE, COUNTDOWN_IMAGES, FrameRenderer(win), timer, prompt_time=args.step,
+                countdown_time=args.step, capture_pause=args.step, result_time=args.step, attract=True,
+                start_hold=2 * args.step, max_fps=0, clock=SteppedClock(args.step), telemetry=telemetry)
+    game.detector = ScriptedPlayer(game)
+
+    # The game prints every prompt and capture; thousands of rounds of that would drown the report
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        game.run(rounds=args.warmup_rounds)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    baseline_objects = len(gc.get_objects())
+    print(f"{'rounds':>7} {'traced KB':>10} {'growth KB':>10} {'objects':>8} {'RSS MB':>8} {'rounds/s':>9}")
+
+    growth = 0.0
+    played = 0
+    while played < args.rounds:
+        chunk = min(args.report_every, args.rounds - played)
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            game.run(rounds=game.rounds_played + chunk)
+        elapsed = time.perf_counter() - start
+        played += chunk
+        gc.collect()
+        current = tracemalloc.get_traced_memory()[0]
+        growth = (current - baseline) / 1024
+        print(f"{played:>7} {current / 1024:>10.1f} {growth:>10.1f} {len(gc.get_objects()) - baseline_objects:>+8} "
+              f"{resident_mb():>8.1f} {chunk / elapsed:>9.1f}")
+    tracemalloc.stop()
+    audio.stop()
+    if telemetry:
+        telemetry.close()
+        print(f"Telemetry: {telemetry.telemetryStats()}")
+    pygame.quit()
+
+    print(f"{game.rounds_played} rounds, last scores {list(game.scores)[-3:]}")
+    if growth > args.max_growth_kb:
+        print(f"Traced memory grew by {growth:.1f} KB, more than {args.max_growth_kb} KB")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
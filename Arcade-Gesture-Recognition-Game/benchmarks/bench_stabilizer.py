@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gestures import PREDEFINED_GESTURES, ConsistencyTracker  # noqa: E402
+from stabilizer import GestureStabilizer  # noqa: E402
+
+
+def play(tracker, expected, fps, flicker, dropout, rng, cooldown, timeout=10.0):
+    # A simulated player makes each expected gesture in turn, starting as soon as the previous capture's
+    # cooldown ends. Each frame the classifier misreads the pose with probability `flicker`, or loses the
+    # hand with probability `dropout`. Returns (seconds to capture or None, correct) per gesture.
+    names = list(PREDEFINED_GESTURES)
+    now = 0.0
+    results = []
+    for gesture in expected:
+        onset = now
+        outcome = (None, False)
+        while now - onset < timeout:
+            now += 1.0 / fps
+            roll = rng.random()
+            if roll < dropout:
+                captured = tracker.update(False, None, now)
+            elif roll < dropout + flicker:
+                captured = tracker.update(True, names[rng.integers(len(names))], now)
+            else:
+                captured = tracker.update(True, gesture, now)
+            if captured:
+                name = getattr(captured, 'gesture', captured)
+                outcome = (now - onset, name == gesture)
+                break
+        results.append(outcome)
+        now += cooldown
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Capture time and accuracy of the hold timer and the voting '
+                                                 'stabiliser on noisy, low frame rate classifications')
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--fps', type=float, nargs='+', default=[8, 15, 30])
+    parser.add_argument('--flicker', type=float, nargs='+', default=[0.0, 0.05, 0.15])
+    parser.add_argument('--dropout', type=float, default=0.05)
+    parser.add_argument('--hold', type=float, default=1.0)
+    parser.add_argument('--cooldown', type=float, default=1.0)
+    parser.add_argument('--window', type=int, default=8)
+    args = parser.parse_args()
+
+    expected = ['Fist', 'Peace', 'five', 'L', 'three', 'pinky', 'four', 'call sign']
+    trackers = {
+        'hold timer': lambda: ConsistencyTracker(expected, args.hold, args.cooldown),
+        'stabiliser': lambda: GestureStabilizer(expected, args.hold, args.cooldown, window=args.window),
+    }
+    print(f"{'fps':>4} {'flicker':>7} {'tracker':<11} {'mean s':>7} {'p95 s':>7} {'std s':>6} {'timeouts':>8} "
+          f"{'correct':>7}")
+    for fps in args.fps:
+        for flicker in args.flicker:
+            for label, make in trackers.items():
+                rng = np.random.default_rng(0)
+                results = [outcome for _ in range(args.rounds)
+                           for outcome in play(make(), expected, fps, flicker, args.dropout, rng, args.cooldown)]
+                times = np.array([t for t, _ in results if t is not None])
+                timeouts = sum(t is None for t, _ in results)
+                correct = sum(ok for _, ok in results) / len(results)
+                if len(times):
+                    summary = f"{times.mean():7.2f} {np.percentile(times, 95):7.2f} {times.std():6.2f}"
+                else:
+                    summary = f"{'-':>7} {'-':>7} {'-':>6}"
+                print(f"{fps:>4g} {flicker:>7.2f} {label:<11} {summary} {timeouts:>8} {correct:>7.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gestures import PREDEFINED_GESTURES  # noqa: E402
+from telemetry import TelemetryWriter, aggregate, log_paths, read_events  # noqa: E402
+
+
+def write_logs(directory, rounds, cabinets, max_bytes):
+    # A synthetic history, one log per cabinet: every round is 8 captures, a few seconds of fps
+    # samples and its result
+    rng = random.Random(0)
+    gestures = sorted(PREDEFINED_GESTURES)
+    writers = [TelemetryWriter(os.path.join(directory, f"cabinet-{n}.jsonl"), f"cabinet-{n}", max_bytes=max_bytes)
+               for n in range(cabinets)]
+    for writer in writers:
+        writer.start()
+    calls = []
+    for writer in writers:
+        writer.log('session_start', players=1)
+    for round_number in range(rounds):
+        writer = writers[round_number % cabinets]
+        expected = rng.sample(gestures, 8)
+        start = time.perf_counter()
+        writer.log('round_start', round=round_number, players=1, expected=expected)
+        calls.append(time.perf_counter() - start)
+        correct = 0
+        for prompt, gesture in enumerate(expected):
+            captured = gesture if rng.random() < 0.8 else rng.choice(gestures + ['Random'])
+            correct += captured == gesture
+            start = time.perf_counter()
+            writer.log('capture', round=round_number, player=0, prompt=prompt, expected=gesture, captured=captured,
+                       correct=captured == gesture, reaction=rng.lognormvariate(0.5, 0.4), hold=1.0 + rng.random() / 4,
+                       frames=30)
+            calls.append(time.perf_counter() - start)
+        for _ in range(10):
+            writer.log('fps', round=round_number, state='capture', fps=rng.gauss(28, 2))
+        writer.log('round_end', round=round_number, scores=[correct], candies=[correct >= 4])
+        # Keep the queue from filling: the game logs a few events per second, not thousands
+        if round_number % 50 == 49:
+            time.sleep(0.01)
+    stats = [writer.telemetryStats() for writer in writers]
+    for writer in writers:
+        writer.close()
+    return sorted(calls), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cost of logging telemetry from the game loop and memory of '
+                                                 'aggregating ever larger logs')
+    parser.add_argument('--rounds', type=int, nargs='+', default=[2000, 10000, 40000])
+    parser.add_argument('--cabinets', type=int, default=4)
+    parser.add_argument('--max-mb', type=float, default=4, help='rotation size for the generated logs')
+    args = parser.parse_args()
+
+    print(f"{'rounds':>7} {'events':>8} {'files':>5} {'log() p50 us':>12} {'p99 us':>7} {'dropped':>7} "
+          f"{'aggregate s':>11} {'events/s':>9} {'peak KB':>8}")
+    for rounds in args.rounds:
+        with tempfile.TemporaryDirectory() as tmp:
+            calls, stats = write_logs(tmp, rounds, args.cabinets, int(args.max_mb * 1024 * 1024))
+            paths = log_paths([tmp])
+            tracemalloc.start()
+            start = time.perf_counter()
+            events = 0
+
+            def counted(records):
+                nonlocal events
+                for record in records:
+                    events += 1
+                    yield record
+
+            cabinets = aggregate(counted(read_events(paths)))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        assert sum(cabinet.rounds for cabinet in cabinets.values()) == rounds
+        print(f"{rounds:>7} {events:>8} {len(paths):>5} {1e6 * calls[len(calls) // 2]:>12.1f} "
+              f"{1e6 * calls[int(len(calls) * 0.99)]:>7.1f} {sum(s['dropped'] for s in stats):>7} "
+              f"{elapsed:>11.2f} {events / elapsed:>9.0f} {peak / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Headless: SDL's dummy drivers stand in for the window and sound card
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, GAME_DIR)
+
+from assets import AssetCache, load_surface  # noqa: E402
+from display import FrameRenderer  # noqa: E402
+from gestures import PREDEFINED_GESTURES, GestureTable, encode_fingers, load_library  # noqa: E402
+from hand_detector import HandDetector, fingers_up  # noqa: E402
+from synthetic_hands import SyntheticResults, all_patterns, make_hand  # noqa: E402
+
+# The prompt images of the bundled gesture library, named relative to its manifest
+LIBRARY = load_library()
+GESTURE_IMAGES = list(LIBRARY.prompts)
+RESOLUTIONS = {'480p': (640, 480), '720p': (1280, 720), '1080p': (1920, 1080)}
+
+
+def measure(fn, min_time=0.5, min_runs=5, max_runs=10000):
+    fn()  # warm-up
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples = np.array(samples) * 1000
+    return {
+        'runs': len(samples),
+        'mean_ms': float(samples.mean()),
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'min_ms': float(samples.min()),
+    }
+
+
+def synthetic_frame(size, seed=0):
+    # Smooth gradient plus noise, so the palm detector has texture to chew on
+    w, h = size
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(40, 200, w, dtype=np.float32)[None, :, None]
+    frame = np.broadcast_to(gradient, (h, w, 3)) + rng.normal(0, 12, (h, w, 3))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def linear_lookup(fingers, gestures):
+    # The original per-frame scan, kept here as the baseline for the lookup table
+    for gesture, pattern in gestures.items():
+        if fingers == pattern:
+            return gesture
+    return None
+
+
+class Suite:
+    def __init__(self, min_time, selected):
+        self.min_time = min_time
+        self.selected = selected
+        self.results = []
+
+    def run(self, name, fn, **params):
+        if self.selected and not any(s in name for s in self.selected):
+            return
+        result = {'name': name, 'params': params, **measure(fn, self.min_time)}
+        self.results.append(result)
+        label = name + ''.join(f" {k}={v}" for k, v in params.items())
+        print(f"{label:<50} {result['mean_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms  ({result['runs']} runs)")
+
+
+def bench_detector(suite, images):
+    frames = {f"image:{name}": img for name, img in images.items()}
+    frames.update({f"synthetic:{label}": synthetic_frame(size) for label, size in RESOLUTIONS.items()})
+    for mode, static in (('static', True), ('video', False)):
+        detector = HandDetector(mode=static)
+        for label, frame in frames.items():
+            suite.run('findHands', lambda: detector.findHands(frame, draw=False), mode=mode, frame=label)
+
+
+def bench_classification(suite):
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    detector = HandDetector()
+    rng = np.random.default_rng(0)
+    patterns = all_patterns()
+    for hands in (1, 2):
+        detector.results = SyntheticResults([make_hand(patterns[rng.integers(32)], center=(0.3 + 0.4 * i, 0.6))
+                                             for i in range(hands)])
+        suite.run('findPosition+fingersUp',
+                  lambda: [detector.fingersUp(detector.findPosition(img, i, draw=False)) for i in range(hands)],
+                  hands=hands)
+        suite.run('findLandmarks+fingers_up', lambda: fingers_up(detector.findLandmarks(img, draw=False)),
+                  hands=hands)
+
+
+def bench_lookup(suite):
+    table = GestureTable(PREDEFINED_GESTURES)
+    patterns = all_patterns()
+    suite.run('gesture_lookup', lambda: [linear_lookup(p, PREDEFINED_GESTURES) for p in patterns],
+              impl='linear_scan', patterns=32)
+    suite.run('gesture_lookup', lambda: [table.lookup(p) for p in patterns], impl='table', patterns=32)
+    codes = encode_fingers(np.array(patterns))
+    suite.run('gesture_lookup', lambda: table.lookup_codes(codes), impl='vectorised', patterns=32)
+
+
+def bench_assets(suite):
+    names = GESTURE_IMAGES
+    suite.run('image_load_convert',
+              lambda: [load_surface(os.path.join(LIBRARY.image_dir, n), (500, 500)) for n in names],
+              impl='decode_each_time', images=len(names))
+    cache = AssetCache(LIBRARY.image_dir)
+    cache.preload(names)
+    suite.run('image_load_convert', lambda: [cache.get(n) for n in names], impl='asset_cache', images=len(names))
+
+
+def bench_render(suite, win):
+    for label, size in RESOLUTIONS.items():
+        frame = synthetic_frame(size)
+        for legacy in (True, False):
+            renderer = FrameRenderer(win, legacy=legacy)
+            suite.run('frame_to_surface', lambda: renderer.present(frame), impl='legacy' if legacy else 'shared_buffer',
+                      frame=label)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=GAME_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['name'], json.dumps(r['params'], sort_keys=True)): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path} (ratio > 1 is slower):")
+    for r in results:
+        old = baseline.get((r['name'], json.dumps(r['params'], sort_keys=True)))
+        if old:
+            label = r['name'] + ''.join(f" {k}={v}" for k, v in r['params'].items())
+            print(f"  {label:<50} x{r['mean_ms'] / old['mean_ms']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless benchmarks for detection, classification and rendering')
+    parser.add_argument('--out', default='benchmark_results.json', help='where to write machine-readable results')
+    parser.add_argument('--compare', metavar='JSON', help='earlier results to compare against')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds to spend on each benchmark')
+    parser.add_argument('-k', dest='selected', action='append', help='only run benchmarks whose name contains this')
+    args = parser.parse_args()
+
+    pygame.init()
+    win = pygame.display.set_mode((1440, 850))
+    images = {name: cv2.imread(os.path.join(LIBRARY.image_dir, name)) for name in GESTURE_IMAGES}
+    images = {name: img for name, img in images.items() if img is not None}
+
+    suite = Suite(args.min_time, args.selected)
+    bench_detector(suite, images)
+    bench_classification(suite)
+    bench_lookup(suite)
+    bench_assets(suite)
+    bench_render(suite, win)
+    pygame.quit()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'results': suite.results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(suite.results)} results to {args.out}")
+    if args.compare:
+        compare(suite.results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
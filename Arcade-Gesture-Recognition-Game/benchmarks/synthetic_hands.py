@@ -0,0 +1,80 @@
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+# Canonical hand with the thumb towards +x, wrist at the origin, y pointing down, one palm length ~ 1.
+# That is a right hand, palm to the camera, which MediaPipe labels "Left" on the unmirrored frame.
+# mirror=True gives the left hand, labelled "Right".
+PALM = {
+    'thumb': [(0.15, -0.10), (0.28, -0.20)],
+    'index': [(0.12, -0.50)],
+    'middle': [(0.00, -0.52)],
+    'ring': [(-0.12, -0.50)],
+    'pinky': [(-0.22, -0.45)],
+}
+THUMB_UP = [(0.38, -0.30), (0.48, -0.38)]
+THUMB_DOWN = [(0.25, -0.32), (0.12, -0.35)]
+FINGER_UP = [(0, -0.20), (0, -0.35), (0, -0.48)]
+FINGER_DOWN = [(0, -0.15), (0, -0.05), (0, 0.02)]
+
+
+def make_hand(fingers, center=(0.5, 0.6), scale=0.3, angle=0.0, mirror=False, noise=0.0, rng=None):
+    # Normalised (21, 3) landmarks for a five-bit finger pattern, laid out like MediaPipe's output
+    points = [(0.0, 0.0)]
+    points += PALM['thumb'] + (THUMB_UP if fingers[0] else THUMB_DOWN)
+    for name, up in zip(['index', 'middle', 'ring', 'pinky'], fingers[1:]):
+        mcp = PALM[name][0]
+        points.append(mcp)
+        points += [(mcp[0] + dx, mcp[1] + dy) for dx, dy in (FINGER_UP if up else FINGER_DOWN)]
+
+    hand = np.zeros((21, 3), dtype=np.float32)
+    hand[:, :2] = points
+    hand[:, 2] = -0.05 * np.abs(hand[:, 1])
+    if mirror:
+        hand[:, 0] = -hand[:, 0]
+    c, s = np.cos(angle), np.sin(angle)
+    hand[:, :2] = hand[:, :2] @ np.array([[c, s], [-s, c]], dtype=np.float32)
+    if noise:
+        rng = rng or np.random.default_rng()
+        hand[:, :2] += rng.normal(0, noise, (21, 2))
+    hand[:, :2] = hand[:, :2] * scale + np.asarray(center, dtype=np.float32)
+    return hand
+
+
+def all_patterns():
+    return [[(code >> (4 - i)) & 1 for i in range(5)] for code in range(32)]
+
+
+class SyntheticResults:
+    # Stand-in for the object returned by mediapipe Hands.process
+    def __init__(self, hands, labels=None):
+        self.multi_hand_landmarks = []
+        self.multi_handedness = []
+        for i, hand in enumerate(hands):
+            proto = landmark_pb2.NormalizedLandmarkList()
+            for x, y, z in hand:
+                proto.landmark.add(x=float(x), y=float(y), z=float(z))
+            self.multi_hand_landmarks.append(proto)
+            label = labels[i] if labels else 'Left'
+            handedness = classification_pb2.ClassificationList()
+            handedness.classification.add(index=int(label == 'Right'), score=0.99, label=label)
+            self.multi_handedness.append(handedness)
+        if not hands:
+            self.multi_hand_landmarks = None
+            self.multi_handedness = None
+
+
+def synthetic_dataset(gestures, per_gesture, rng, max_angle=0.0, left_fraction=0.0, noise=0.01, frame_height=480):
+    # Randomly placed, sized and rotated hands for each named pattern, in isotropic pixel coordinates.
+    # left_fraction is the share of mirrored (the player's left) hands.
+    # Returns (n, 21, 3) landmarks, gesture names and MediaPipe's 'Left'/'Right' labels.
+    landmarks, labels, handedness = [], [], []
+    for name, pattern in gestures.items():
+        for _ in range(per_gesture):
+            left = rng.random() < left_fraction
+            hand = make_hand(pattern, center=(rng.uniform(0.3, 1.0), rng.uniform(0.4, 0.7)),
+                             scale=rng.uniform(0.2, 0.4), angle=np.radians(rng.uniform(-max_angle, max_angle)),
+                             mirror=left, noise=noise, rng=rng)
+            landmarks.append(hand * frame_height)
+            labels.append(name)
+            handedness.append('Right' if left else 'Left')
+    return np.array(landmarks, dtype=np.float32), np.array(labels), handedness
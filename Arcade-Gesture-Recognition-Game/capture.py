@@ -0,0 +1,277 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from instrumentation import RollingHistogram
+
+# Pixel formats tried in order: MJPG is compressed over USB, so most webcams only reach full frame
+# rate at 640x480 and above in it; YUYV is the uncompressed fallback every UVC camera offers
+FORMATS = ('MJPG', 'YUYV')
+# A frame arriving more than this many nominal frame periods after the previous one counts as late
+LATE_FACTOR = 1.5
+
+
+def fourcc_name(code):
+    return int(code).to_bytes(4, 'little').decode('ascii', 'replace').strip('\x00')
+
+
+class CameraSource:
+    # An OpenCV camera opened in an explicit mode instead of whatever the driver defaults to. The
+    # pixel format is set before the size and rate, since V4L2 drivers list their modes per format;
+    # the driver rounds each request to the nearest mode it supports, so `settings` holds what was
+    # actually granted. Its internal queue is cut to one frame where the backend allows it.
+    def __init__(self, index=0, size=None, fps=None, formats=FORMATS, clock=time.perf_counter):
+        self.cap = cv2.VideoCapture(index)
+        self.clock = clock
+        self.timestamp = None
+        self.lost = 0
+        if self.cap.isOpened():
+            self._negotiate(size, fps, formats)
+        self.settings = self._granted(index)
+
+    def _negotiate(self, size, fps, formats):
+        for name in formats:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*name))
+            if fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)) == name:
+                break
+        if size:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def _granted(self, index):
+        if not self.cap.isOpened():
+            return {'source': f"camera {index}", 'opened': False}
+        return {
+            'source': f"camera {index} ({self.cap.getBackendName()})",
+            'opened': True,
+            'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': self.cap.get(cv2.CAP_PROP_FPS),
+            'format': fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)),
+        }
+
+    def read(self, out=None):
+        success, img = self.cap.read(out)
+        self.timestamp = self.clock()
+        return success, img
+
+    def release(self):
+        self.cap.release()
+
+
+class PacedSource:
+    # Base for the file and synthetic sources: hands out frames on a fixed frame-rate schedule,
+    # modelling a camera's driver queue. A reader that falls behind gets the oldest of the last
+    # `buffer` frames (each stamped with the time it was due) and anything older is lost, just as
+    # cv2.VideoCapture queues frames during a slow game loop. With realtime=False frames come as
+    # fast as they are read.
+    def __init__(self, fps, buffer=4, realtime=True, clock=time.perf_counter):
+        self.fps = fps
+        self.buffer = buffer
+        self.realtime = realtime
+        self.clock = clock
+        self.index = 0
+        self.first = None
+        self.timestamp = None
+        self.lost = 0
+
+    def _schedule(self):
+        # Advances to the next frame to deliver; returns how many frames were lost on the way
+        now = self.clock()
+        if not self.realtime:
+            self.timestamp = now
+            self.index += 1
+            return 0
+        if self.first is None:
+            self.first = now
+        due = self.first + self.index / self.fps
+        skipped = 0
+        if due > now:
+            time.sleep(due - now)
+        else:
+            newest = int((now - self.first) * self.fps)
+            skipped = max(0, newest - self.buffer + 1 - self.index)
+            self.index += skipped
+            self.lost += skipped
+            due = self.first + self.index / self.fps
+        self.timestamp = due
+        self.index += 1
+        return skipped
+
+    def release(self):
+        pass
+
+
+class FileSource(PacedSource):
+    # A video file played back as if it were a live camera, optionally looping
+    def __init__(self, path, loop=False, buffer=4, realtime=True, clock=time.perf_counter):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS) or 30.0, buffer, realtime, clock)
+        self.loop = loop
+        self.settings = {
+            'source': path,
+            'opened': self.cap.isOpened(),
+            'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': self.fps,
+            'format': fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)),
+        }
+
+    def _next(self, out):
+        success, img = self.cap.read(out)
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, img = self.cap.read(out)
+        return success, img
+
+    def read(self, out=None):
+        for _ in range(self._schedule()):
+            if not self._next(None)[0]:
+                return False, None
+        return self._next(out)
+
+    def release(self):
+        self.cap.release()
+
+
+class SyntheticSource(PacedSource):
+    # Generated frames (a square sweeping across a gradient) at any size and rate, for exercising
+    # capture and display without a camera. Stops after `frames` frames when given.
+    def __init__(self, size=(640, 480), fps=30.0, frames=None, buffer=4, realtime=True, clock=time.perf_counter):
+        super().__init__(fps, buffer, realtime, clock)
+        self.size = size
+        self.frames = frames
+        width, height = size
+        ramp = np.linspace(40, 200, width, dtype=np.uint8)
+        self.background = np.repeat(np.tile(ramp, (height, 1))[:, :, None], 3, axis=2)
+        self.settings = {'source': 'synthetic', 'opened': True, 'width': width, 'height': height, 'fps': fps,
+                         'format': 'BGR3'}
+
+    def read(self, out=None):
+        self._schedule()
+        index = self.index - 1
+        if self.frames is not None and index >= self.frames:
+            return False, None
+        if out is None or out.shape != self.background.shape:
+            out = self.background.copy()
+        else:
+            np.copyto(out, self.background)
+        width, height = self.size
+        side = height // 4
+        x = index * 8 % max(width - side, 1)
+        cv2.rectangle(out, (x, (height - side) // 2), (x + side, (height + side) // 2), (0, 0, 255), cv2.FILLED)
+        return True, out
+
+
+class FrameGrabber:
+    # Reads a source continuously on a background thread and keeps only the newest frame, so a
+    # slow game loop never works through a backlog of stale frames. read() hands over the freshest
+    # frame not yet delivered, waiting for one if needed; a frame replaced before anyone read it is
+    # counted as dropped. Each frame is stamped when it was captured (`timestamp` after read()),
+    # and its age on delivery is tracked. Buffers passed back into read() are reused for later
+    # frames, like cv2.VideoCapture.read(out).
+    def __init__(self, source, clock=time.perf_counter, window=1000):
+        self.source = source
+        self.clock = clock
+        self.settings = source.settings
+        fps = self.settings.get('fps') or 0
+        self.period = 1 / fps if fps > 0 else None
+        self.latest = None
+        self.latest_timestamp = None
+        self.spare = None
+        self.timestamp = None
+        self.closed = False
+        self.cond = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.age = RollingHistogram(window)
+        self.stats = {'captured': 0, 'delivered': 0, 'dropped': 0, 'skipped': 0, 'late': 0}
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._grab_loop, name='grabber', daemon=True)
+        self.thread.start()
+        return self
+
+    def _grab_loop(self):
+        while not self.stop_event.is_set():
+            with self.cond:
+                buffer, self.spare = self.spare, None
+            success, img = self.source.read(buffer)
+            if not success:
+                break
+            timestamp = self.source.timestamp or self.clock()
+            with self.cond:
+                if self.latest is not None:
+                    self.stats['dropped'] += 1
+                    self.spare = self.latest
+                if self.period and self.last_timestamp and timestamp - self.last_timestamp > LATE_FACTOR * self.period:
+                    self.stats['late'] += 1
+                if self.first_timestamp is None:
+                    self.first_timestamp = timestamp
+                self.last_timestamp = timestamp
+                self.latest, self.latest_timestamp = img, timestamp
+                self.stats['captured'] += 1
+                self.cond.notify()
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def read(self, out=None, timeout=None):
+        with self.cond:
+            if out is not None and self.spare is None:
+                self.spare = out
+            while self.latest is None and not self.closed:
+                if not self.cond.wait(timeout):
+                    break
+            if self.latest is None:
+                return False, None
+            img, self.latest = self.latest, None
+            self.timestamp = self.latest_timestamp
+            self.stats['delivered'] += 1
+        self.age.add(self.clock() - self.timestamp)
+        return True, img
+
+    def grab(self):
+        # Never blocks: the grab thread already keeps the camera drained, so this only discards
+        # a pending frame nobody is going to look at
+        with self.cond:
+            if self.latest is not None:
+                self.stats['skipped'] += 1
+                self.spare, self.latest = self.latest, None
+            return not self.closed
+
+    def isOpened(self):
+        return self.settings.get('opened', False) and not self.closed
+
+    def release(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.source.release()
+
+    def captureStats(self):
+        span = (self.last_timestamp or 0) - (self.first_timestamp or 0)
+        p50, p95 = (1000 * float(p) for p in self.age.percentiles((50, 95)))
+        return dict(self.settings, **self.stats, lost=self.source.lost,
+                    measured_fps=(self.stats['captured'] - 1) / span if span > 0 else 0.0,
+                    age_p50_ms=p50, age_p95_ms=p95)
+
+
+def open_capture(source='0', size=None, fps=None, formats=FORMATS, loop=True):
+    # "0", "1", ... open a camera; "synthetic" generates frames; anything else is a video file,
+    # looped by default so it stands in for a camera for as long as the game runs
+    if source == 'synthetic':
+        frames = SyntheticSource(size or (640, 480), fps or 30.0)
+    elif source.isdigit():
+        frames = CameraSource(int(source), size, fps, formats)
+    else:
+        frames = FileSource(source, loop=loop)
+    return FrameGrabber(frames).start()
@@ -0,0 +1,175 @@
+import numpy as np
+
+from gestures import encode_fingers
+from hand_detector import THUMB_DIRECTION, fingers_up
+
+# Wrist and middle-finger knuckle: the palm axis every hand is rotated and scaled to
+WRIST = 0
+MIDDLE_MCP = 9
+# Saved with every model; bump when landmark_features changes so older models are refused instead
+# of silently misclassifying. 2: left hands mirrored by the corrected THUMB_DIRECTION.
+FEATURE_VERSION = 2
+
+
+def landmark_features(landmarks, handedness=None):
+    # (hands, 21, 3) pixel landmarks -> (hands, 42) pose features that don't depend on where the
+    # hand is, how big it is or how it's rotated: wrist at the origin, wrist-to-middle-knuckle axis
+    # pointing up with unit length. With handedness labels the player's left hands are mirrored onto
+    # right hands (see THUMB_DIRECTION).
+    lm = np.array(landmarks, dtype=np.float32)[..., :2]
+    lm -= lm[:, WRIST:WRIST + 1]
+    if handedness is not None:
+        lm[..., 0] *= np.array([THUMB_DIRECTION.get(label, 1) for label in handedness], dtype=np.float32)[:, None]
+
+    ux, uy = lm[:, MIDDLE_MCP].T
+    length_squared = ux * ux + uy * uy
+    length_squared[length_squared == 0] = 1.0
+    # Per-hand matrix rotating the palm axis onto (0, -1) and dividing by its length
+    rotation = np.stack([np.stack([-uy, -ux], axis=-1), np.stack([ux, -uy], axis=-1)], axis=1)
+    rotation /= length_squared[:, None, None]
+    return (lm @ rotation).reshape(len(lm), -1)
+
+
+class HeuristicClassifier:
+    # The fingersUp rule behind the same interface as the learned models
+    def __init__(self, gesture_table):
+        self.gesture_table = gesture_table
+
+    def predict(self, landmarks, handedness=None):
+        return self.gesture_table.lookup_codes(encode_fingers(fingers_up(landmarks, handedness)))
+
+
+class LandmarkClassifier:
+    # Base for models trained on landmark_features. predict() takes a whole batch of hands and
+    # returns one gesture name per hand; everything runs as NumPy matrix products.
+    kind = None
+
+    def fit(self, landmarks, labels, handedness=None):
+        self.classes, targets = np.unique(np.asarray(labels), return_inverse=True)
+        self._fit(landmark_features(landmarks, handedness), targets)
+        return self
+
+    def predict(self, landmarks, handedness=None, batch_size=4096):
+        if not len(landmarks):
+            return np.empty(0, dtype=object)
+        features = landmark_features(landmarks, handedness)
+        indices = np.concatenate([self._predict(features[i:i + batch_size])
+                                  for i in range(0, len(features), batch_size)])
+        return self.classes.astype(object)[indices]
+
+    def save(self, path):
+        np.savez(path, kind=self.kind, classes=self.classes, feature_version=FEATURE_VERSION, **self._params())
+
+    @classmethod
+    def from_params(cls, classes, params):
+        model = cls()
+        model.classes = classes
+        for name, value in params.items():
+            setattr(model, name, value)
+        return model
+
+
+def squared_distances(a, b):
+    # Pairwise squared Euclidean distances via one matrix product
+    return (a * a).sum(axis=1)[:, None] - 2 * a @ b.T + (b * b).sum(axis=1)[None, :]
+
+
+class NearestCentroidClassifier(LandmarkClassifier):
+    kind = 'centroid'
+
+    def _fit(self, features, targets):
+        self.centroids = np.stack([features[targets == i].mean(axis=0) for i in range(len(self.classes))])
+
+    def _predict(self, features):
+        return squared_distances(features, self.centroids).argmin(axis=1)
+
+    def _params(self):
+        return {'centroids': self.centroids}
+
+
+class KNNClassifier(LandmarkClassifier):
+    kind = 'knn'
+
+    def __init__(self, k=5):
+        self.k = k
+
+    def _fit(self, features, targets):
+        self.features = features
+        self.targets = targets
+
+    def _predict(self, features):
+        k = min(int(self.k), len(self.features))
+        nearest = np.argpartition(squared_distances(features, self.features), k - 1, axis=1)[:, :k]
+        votes = np.zeros((len(features), len(self.classes)), dtype=np.int32)
+        np.add.at(votes, (np.arange(len(features))[:, None], self.targets[nearest]), 1)
+        return votes.argmax(axis=1)
+
+    def _params(self):
+        return {'features': self.features, 'targets': self.targets, 'k': self.k}
+
+
+class MLPClassifier(LandmarkClassifier):
+    # One hidden ReLU layer with a softmax output, trained full-batch with Adam
+    kind = 'mlp'
+
+    def __init__(self, hidden=32, epochs=500, learning_rate=0.01, seed=0):
+        self.hidden = hidden
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.seed = seed
+
+    def _fit(self, features, targets):
+        rng = np.random.default_rng(self.seed)
+        self.mean = features.mean(axis=0)
+        self.std = features.std(axis=0) + 1e-6
+        x = (features - self.mean) / self.std
+        onehot = np.eye(len(self.classes), dtype=np.float32)[targets]
+        params = [
+            rng.normal(0, np.sqrt(2 / x.shape[1]), (x.shape[1], self.hidden)).astype(np.float32),
+            np.zeros(self.hidden, dtype=np.float32),
+            rng.normal(0, np.sqrt(1 / self.hidden), (self.hidden, len(self.classes))).astype(np.float32),
+            np.zeros(len(self.classes), dtype=np.float32),
+        ]
+        moments = [np.zeros_like(p) for p in params]
+        velocities = [np.zeros_like(p) for p in params]
+        beta1, beta2 = 0.9, 0.999
+        for step in range(1, self.epochs + 1):
+            w1, b1, w2, b2 = params
+            hidden = np.maximum(x @ w1 + b1, 0)
+            probs = softmax(hidden @ w2 + b2)
+            grad_out = (probs - onehot) / len(x)
+            grad_hidden = (grad_out @ w2.T) * (hidden > 0)
+            grads = [x.T @ grad_hidden, grad_hidden.sum(axis=0), hidden.T @ grad_out, grad_out.sum(axis=0)]
+            for p, g, m, v in zip(params, grads, moments, velocities):
+                m[:] = beta1 * m + (1 - beta1) * g
+                v[:] = beta2 * v + (1 - beta2) * g * g
+                p -= self.learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + 1e-8)
+        self.w1, self.b1, self.w2, self.b2 = params
+
+    def _predict(self, features):
+        hidden = np.maximum(((features - self.mean) / self.std) @ self.w1 + self.b1, 0)
+        return (hidden @ self.w2 + self.b2).argmax(axis=1)
+
+    def _params(self):
+        return {'mean': self.mean, 'std': self.std, 'w1': self.w1, 'b1': self.b1, 'w2': self.w2, 'b2': self.b2}
+
+
+def softmax(logits):
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+CLASSIFIERS = {cls.kind: cls for cls in (NearestCentroidClassifier, KNNClassifier, MLPClassifier)}
+
+
+def load_classifier(path):
+    with np.load(path) as data:
+        kind = str(data['kind'])
+        if kind not in CLASSIFIERS:
+            raise ValueError(f"{path} holds an unknown classifier kind {kind!r}")
+        version = int(data['feature_version']) if 'feature_version' in data.files else 1
+        if version != FEATURE_VERSION:
+            raise ValueError(f"{path} was trained on landmark features version {version}, not {FEATURE_VERSION}; "
+                             f"retrain it with train_classifier.py")
+        params = {name: data[name] for name in data.files if name not in ('kind', 'classes', 'feature_version')}
+        return CLASSIFIERS[kind].from_params(data['classes'], params)
@@ -0,0 +1,84 @@
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+
+class FrameRenderer:
+    # Shows camera frames through one preallocated RGB buffer wrapped by a pygame surface that
+    # shares its memory, so steady-state rendering allocates no full-frame buffers. The window
+    # background is only cleared after other screens have drawn over it; otherwise just the
+    # camera rectangle is pushed to the display.
+    def __init__(self, win, legacy=False):
+        self.win = win
+        self.legacy = legacy
+        self.rgb = None
+        self.surface = None
+        self.rect = None
+        self.needs_clear = True
+        # buffer_allocations counts (re)allocations of the shared buffer; the legacy path allocates
+        # inside cv2 and pygame where it can't be counted, so only its render time is comparable
+        self.stats = {'frames': 0, 'buffer_allocations': 0, 'shared_conversions': 0, 'render_time': 0.0}
+
+    def _allocate(self, height, width):
+        self.rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self.rgb, (width, height), 'RGB')
+        self.rect = self.surface.get_rect(center=self.win.get_rect().center)
+        self.needs_clear = True
+        self.stats['buffer_allocations'] += 1
+
+    def convert(self, img):
+        # BGR camera frame -> the renderer's RGB buffer, which callers can hand to the detector
+        # so the frame is only colour-converted once
+        if self.rgb is None or self.rgb.shape != img.shape:
+            self._allocate(*img.shape[:2])
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.rgb
+
+    def invalidate(self):
+        self.needs_clear = True
+
+    def present(self, img, rgb=None):
+        start = time.perf_counter()
+        if self.legacy:
+            self._present_legacy(img)
+        else:
+            if rgb is self.rgb and rgb is not None:
+                self.stats['shared_conversions'] += 1
+            elif rgb is not None:
+                if self.rgb is None or self.rgb.shape != rgb.shape:
+                    self._allocate(*rgb.shape[:2])
+                np.copyto(self.rgb, rgb)
+            else:
+                self.convert(img)
+
+            if self.needs_clear:
+                self.win.fill((255, 255, 255))  # Set the background to white
+                self.win.blit(self.surface, self.rect)
+                pygame.display.update()
+                self.needs_clear = False
+            else:
+                self.win.blit(self.surface, self.rect)
+                pygame.display.update(self.rect)
+        self.stats['frames'] += 1
+        self.stats['render_time'] += time.perf_counter() - start
+
+    def _present_legacy(self, img):
+        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        imgSurface = pygame.surfarray.make_surface(imgRGB)
+        imgSurface = pygame.transform.rotate(imgSurface, -90)
+        imgSurface = pygame.transform.flip(imgSurface, True, False)
+        self.win.fill((255, 255, 255))  # Set the background to white
+        self.win.blit(imgSurface, ((self.win.get_width() - imgSurface.get_width()) // 2,
+                                   (self.win.get_height() - imgSurface.get_height()) // 2))
+        pygame.display.update()
+
+    def renderStats(self):
+        frames = self.stats['frames'] or 1
+        return {
+            'frames': self.stats['frames'],
+            'buffer_allocations': self.stats['buffer_allocations'],
+            'shared_conversions': self.stats['shared_conversions'],
+            'mean_render_ms': 1000 * self.stats['render_time'] / frames,
+        }
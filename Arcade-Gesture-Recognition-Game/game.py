@@ -0,0 +1,415 @@
+import collections
+import random
+import time
+
+import pygame
+
+from gestures import encode_fingers
+from hand_detector import fingers_up
+from hand_tracking import HandTracker
+from instrumentation import DISABLED
+from pipeline import GesturePipeline
+from stabilizer import GestureStabilizer, LandmarkFilter
+
+PROMPT = 'prompt'
+COUNTDOWN = 'countdown'
+LOADING = 'loading'
+CAPTURE = 'capture'
+RESULT = 'result'
+ATTRACT = 'attract'
+DONE = 'done'
+
+
+def process_frame(detector, img, gesture_table, imgRGB=None, instrumentation=DISABLED, landmark_filter=None,
+                  timestamp=None):
+    # detector is a HandDetector or anything with the same detect() interface
+    landmarks = detector.detect(img, imgRGB=imgRGB)
+    if landmark_filter:
+        landmarks = landmark_filter.update(landmarks[:1], time.monotonic() if timestamp is None else timestamp)
+    gesture_name = None
+    if len(landmarks) != 0:
+        with instrumentation.stage('classify'):
+            if detector.classifier:
+                gesture_name = detector.classifier.predict(landmarks[:1], detector.handedness[:1] or None)[0]
+            else:
+                fingers = fingers_up(landmarks[:1])[0]
+                gesture_name = gesture_table.lookup_code(int(encode_fingers(fingers)))
+    return img, len(landmarks) != 0, gesture_name
+
+
+def process_hands(detector, img, gesture_table, hand_tracker, players, imgRGB=None, instrumentation=DISABLED):
+    # Classifies every detected hand in one pass and assigns each to a player by its track.
+    # Returns img and {player: gesture_name} for the players with a hand in view.
+    landmarks = detector.detect(img, imgRGB=imgRGB)
+    with instrumentation.stage('classify'):
+        ids = hand_tracker.update(landmarks, (img.shape[1], img.shape[0]))
+        hands = {}
+        if len(landmarks) != 0:
+            handedness = detector.handedness if len(detector.handedness) == len(landmarks) else None
+            if detector.classifier:
+                names = detector.classifier.predict(landmarks, handedness)
+            else:
+                names = gesture_table.lookup_codes(encode_fingers(fingers_up(landmarks, handedness)))
+            # The longest-tracked hand in a player's area is the one that counts
+            for track_id, gesture_name in sorted(zip(ids, names), key=lambda hand: hand[0]):
+                hands.setdefault(hand_tracker.player_for(track_id, players), gesture_name)
+    return img, hands
+
+
+def display_text_on_screen(win, text, font_size=64):
+    if not pygame.font.get_init():
+        print("Font system not initialized. Cannot display text.")
+        return
+
+    try:
+        font = pygame.font.Font(None, font_size)
+        win.fill((255, 255, 255))  # Set the background to white
+        # One line per player in multi-player results
+        lines = text.split('\n')
+        line_height = font.get_linesize()
+        top = (win.get_height() - line_height * len(lines)) // 2
+        for i, line in enumerate(lines):
+            text_surface = font.render(line, True, (0, 0, 0))
+            win.blit(text_surface, ((win.get_width() - text_surface.get_width()) // 2, top + i * line_height))
+        pygame.display.update()
+    except pygame.error as e:
+        print(f"Error rendering text: {e}")
+
+
+def candies_won(correct_count):
+    if correct_count == 8:
+        return 3
+    elif correct_count >= 5:
+        return 2
+    elif correct_count >= 4:
+        return 1
+    return 0
+
+
+def result_message(correct_count):
+    return RESULT_MESSAGES[candies_won(correct_count)]
+
+
+RESULT_MESSAGES = {3: ("You win 3 candies!", 'cheering'), 2: ("You win 2 candies!", 'clapping'),
+                   1: ("You win 1 candy!", 'clapping'), 0: ("Keep practicing!", 'over')}
+
+
+class Game:
+    # One round as a frame-driven state machine: prompt images, countdown, capture, result.
+    # Every frame pumps events and drains the camera, so nothing blocks and no stale frames
+    # build up while a screen is waiting on its timer.
+    # With a Warmup, cap/detector start out empty and are filled in from its result as soon as it
+    # finishes; capture holds on a loading screen until then. Sounds go through an AudioEngine,
+    # which skips cues that are still being decoded.
+    # In attract mode the game never ends on its own: after each result it waits for a hand to be
+    # held up and starts another round on the same camera, detector, surfaces and audio. Only the
+    # last `history` scores are kept so memory stays flat however long the machine runs.
+    # With a TelemetryWriter, round starts and ends, every capture (with the player's reaction time
+    # since the prompt opened) and a frame-rate sample each second are logged to it.
+    def __init__(self, win, assets, audio, cap, detector, gesture_table, images, image_to_gesture,
+                 countdown_images, renderer, timer, pipelined=False, num_images=8, prompt_time=1.0,
+                 countdown_time=1.0, capture_pause=1.0, result_time=5.0, players=1, overlay=False,
+                 clock=time.monotonic, warmup=None, attract=False, start_hold=1.0, history=100, max_fps=120,
+                 vote_window=8, smoothing=None, telemetry=None):
+        self.win = win
+        self.assets = assets
+        self.audio = audio
+        self.cap = cap
+        self.detector = detector
+        self.gesture_table = gesture_table
+        self.images = images
+        self.image_to_gesture = image_to_gesture
+        self.countdown_images = countdown_images
+        self.renderer = renderer
+        self.timer = timer
+        self.pipelined = pipelined
+        self.pipeline = None
+        self.num_images = num_images
+        self.prompt_time = prompt_time
+        self.countdown_time = countdown_time
+        self.capture_pause = capture_pause
+        self.result_time = result_time
+        self.players = players
+        self.overlay = overlay
+        self.hand_tracker = HandTracker()
+        self.clock = clock
+        self.warmup = warmup
+        self.attract = attract
+        self.start_hold = start_hold
+        self.max_fps = max_fps
+        self.vote_window = vote_window
+        # Landmark smoothing (time constant in seconds) only applies to the single-player path
+        self.landmark_filter = LandmarkFilter(smoothing) if smoothing else None
+        self.telemetry = telemetry
+        self.fps_frames = 0
+        self.fps_since = 0.0
+        self.rounds_limit = None
+        self.rounds_played = 0
+        self.scores = collections.deque(maxlen=history)
+        self.hand_since = None
+        self.frame = None
+        self.state = None
+        if cap is not None:
+            self.attach(cap, detector)
+
+    def attach(self, cap, detector):
+        self.cap = cap
+        self.detector = detector
+        if self.pipelined and self.pipeline is None:
+            self.pipeline = GesturePipeline(cap, self.process, self.timer).start()
+            self.sync_pipeline()
+
+    def sync_pipeline(self):
+        # Pipelined inference only runs on the screens that look at hands
+        if self.pipeline is None:
+            return
+        if self.state in (CAPTURE, ATTRACT):
+            self.pipeline.resume()
+        else:
+            self.pipeline.pause()
+
+    def ready(self):
+        if self.warmup is None:
+            return True
+        if not self.warmup.done():
+            return False
+        resources = self.warmup.wait()
+        self.warmup = None
+        self.attach(resources['cap'], resources['detector'])
+        return True
+
+    def play(self, name):
+        self.audio.play(name)
+
+    def log(self, event, **fields):
+        if self.telemetry:
+            self.telemetry.log(event, round=self.rounds_played + 1, **fields)
+
+    def sample_fps(self, now):
+        # One sample per second of frames actually read; the second starts with the first frame and
+        # enter() drops a partial one, so each sample belongs to the screen whose frames it counts
+        if not self.fps_frames:
+            self.fps_since = now
+        elif now - self.fps_since >= 1.0:
+            self.log('fps', state=self.state, fps=self.fps_frames / (now - self.fps_since))
+            self.fps_frames = 0
+            self.fps_since = now
+
+    def start(self):
+        self.selected_images = random.sample(self.images, self.num_images)
+        # Ensure the selected images map to gestures without repetition
+        self.expected_gestures = [self.image_to_gesture[img] for img in self.selected_images]
+        # Every player is scored against the same prompted sequence with their own tracker
+        self.hand_tracker = HandTracker()
+        self.player_captures = [[] for _ in range(self.players)]
+        self.trackers = [GestureStabilizer(self.expected_gestures, cooldown=self.capture_pause, window=self.vote_window)
+                         for _ in range(self.players)]
+        self.captured_gestures = self.player_captures[0]
+        self.correct_counts = [0] * self.players
+        self.correct_count = 0
+        self.round_started = self.clock()
+        self.log('round_start', players=self.players, expected=self.expected_gestures)
+        self.enter(PROMPT)
+
+    def enter(self, state):
+        if state == LOADING and self.ready():
+            state = CAPTURE
+        self.state = state
+        self.step = -1
+        self.state_started = self.clock()
+        # Frames counted on the last screen would otherwise be logged under this one
+        self.fps_frames = 0
+        self.fps_since = self.state_started
+        self.sync_pipeline()
+        if state == LOADING:
+            display_text_on_screen(self.win, "Loading...", 64)
+        elif state == CAPTURE:
+            print(f"Expected Gestures: {self.expected_gestures}")
+            self.prompt_started = [self.state_started] * self.players
+            self.renderer.invalidate()
+            self.timer.reset()
+            # Camera frames are first shown here, after the prompts; first_frame minus this is the
+            # time to put the first one on screen
+            self.timer.milestone('capture_start')
+        elif state == RESULT:
+            self.correct_counts = [sum(1 for expected, captured in zip(self.expected_gestures, captures)
+                                       if expected == captured) for captures in self.player_captures]
+            self.correct_count = max(self.correct_counts)
+            if self.players == 1:
+                message, sound = result_message(self.correct_count)
+            else:
+                message = '\n'.join(f"Player {player + 1}: {result_message(count)[0]}"
+                                    for player, count in enumerate(self.correct_counts))
+                sound = result_message(self.correct_count)[1]
+            display_text_on_screen(self.win, message, 64)
+            self.play(sound)
+            self.log('round_end', scores=self.correct_counts,
+                     candies=[candies_won(count) for count in self.correct_counts],
+                     duration=self.state_started - self.round_started)
+            self.rounds_played += 1
+            self.scores.append(tuple(self.correct_counts))
+        elif state == ATTRACT:
+            self.hand_since = None
+            display_text_on_screen(self.win, "Show your hand to play!", 64)
+
+    def run(self, rounds=None):
+        # Plays one round, or in attract mode keeps going until quit or `rounds` rounds are done
+        frame_clock = pygame.time.Clock()
+        self.rounds_limit = rounds
+        self.start()
+        while self.state != DONE:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.state = DONE
+            if self.state == DONE:
+                break
+            self.update()
+            # Only paces the loop when the camera isn't already doing so
+            frame_clock.tick(self.max_fps)
+        return self.captured_gestures
+
+    def update(self):
+        now = self.clock()
+        elapsed = now - self.state_started
+        self.ready()
+        if self.telemetry:
+            self.sample_fps(now)
+        if self.state == PROMPT:
+            self.drain()
+            self.show_sequence(self.selected_images, elapsed, self.prompt_time, COUNTDOWN)
+        elif self.state == COUNTDOWN:
+            self.drain()
+            self.show_sequence(self.countdown_images, elapsed, self.countdown_time, LOADING, sound='beep')
+        elif self.state == LOADING:
+            if self.ready():
+                self.enter(CAPTURE)
+        elif self.state == CAPTURE:
+            self.capture(now)
+        elif self.state == RESULT:
+            self.drain()
+            if elapsed >= self.result_time:
+                if not self.attract or (self.rounds_limit and self.rounds_played >= self.rounds_limit):
+                    self.state = DONE
+                else:
+                    self.enter(ATTRACT)
+        elif self.state == ATTRACT:
+            self.wait_for_player(now)
+
+    def wait_for_player(self, now):
+        if not self.ready():
+            return
+        result = self.read()
+        if result is False:
+            self.state = DONE
+            return
+        if result is None:
+            return
+        if not result[2]:
+            self.hand_since = None
+        elif self.hand_since is None:
+            self.hand_since = now
+        elif now - self.hand_since >= self.start_hold:
+            self.start()
+
+    def show_sequence(self, names, elapsed, duration, next_state, sound=None):
+        step = int(elapsed // duration)
+        if step >= len(names):
+            self.enter(next_state)
+            return
+        if step != self.step:
+            self.step = step
+            self.show_image(names[step])
+            if sound:
+                self.play(sound)
+
+    def show_image(self, name, size=(500, 500)):
+        image_surface = self.assets.get(name, size)
+        self.win.fill((255, 255, 255))  # Set the background to white
+        if image_surface is None:
+            print(f"Error loading image {name}")
+        else:
+            self.win.blit(image_surface, ((self.win.get_width() - size[0]) // 2,
+                                          (self.win.get_height() - size[1]) // 2))
+        pygame.display.update()
+
+    def drain(self):
+        # Keep the camera (or pipeline) flowing so the first capture frame is current
+        if self.pipeline:
+            self.pipeline.get(timeout=0)
+        elif self.cap is None or not self.cap.grab():
+            time.sleep(0.005)
+
+    def process(self, img, imgRGB=None):
+        # img -> (img, {player: gesture_name}); also run on the pipeline's inference thread
+        if self.players > 1:
+            return process_hands(self.detector, img, self.gesture_table, self.hand_tracker, self.players, imgRGB,
+                                 self.timer)
+        timestamp = self.clock() if self.landmark_filter else None
+        img, hand_found, gesture_name = process_frame(self.detector, img, self.gesture_table, imgRGB, self.timer,
+                                                      self.landmark_filter, timestamp)
+        return img, {0: gesture_name} if hand_found else {}
+
+    def read(self):
+        if self.pipeline:
+            result = self.pipeline.get()
+            if result is None:
+                return None if self.pipeline.alive else False
+            img, hands = result
+            self.fps_frames += 1
+            return img, None, hands
+
+        with self.timer.stage('capture'):
+            # Read into the previous frame's buffer instead of allocating a new one
+            success, self.frame = self.cap.read(self.frame)
+        if not success:
+            return False
+
+        # One RGB conversion, shared by hand inference and the display
+        rgb = None
+        if not self.renderer.legacy:
+            with self.timer.stage('convert'):
+                rgb = self.renderer.convert(self.frame)
+        with self.timer.stage('inference'):
+            img, hands = self.process(self.frame, rgb)
+        self.fps_frames += 1
+        return img, rgb, hands
+
+    def capture(self, now):
+        result = self.read()
+        if result is False:
+            # Camera gone: score what was captured so far
+            self.enter(RESULT)
+            return
+        if result is None:
+            return
+        img, rgb, hands = result
+
+        for player, tracker in enumerate(self.trackers):
+            captures = self.player_captures[player]
+            if len(captures) >= len(self.expected_gestures):
+                continue
+            event = tracker.update(player in hands, hands.get(player), now)
+            if event:
+                captured = event.gesture
+                expected = self.expected_gestures[len(captures)]
+                self.log('capture', player=player, prompt=len(captures), expected=expected, captured=captured,
+                         correct=captured == expected, reaction=event.timestamp - self.prompt_started[player],
+                         hold=event.latency, frames=event.frames)
+                # The tracker ignores the hand until the pause after a capture is over
+                self.prompt_started[player] = event.timestamp + self.capture_pause
+                captures.append(captured)
+                self.timer.record('hold', event.latency)
+                print(f"Gesture: {captured}" if self.players == 1 else f"Player {player + 1} Gesture: {captured}")
+                self.play('beep')
+
+        # Show real-time camera feed in Pygame window
+        with self.timer.stage('render'):
+            self.renderer.present(img, rgb)
+        self.timer.milestone('first_frame')
+        if self.overlay:
+            overlay_rect = self.timer.draw_overlay(self.win)
+            if overlay_rect:
+                pygame.display.update(overlay_rect)
+
+        if all(len(captures) >= len(self.expected_gestures) for captures in self.player_captures):
+            self.enter(RESULT)
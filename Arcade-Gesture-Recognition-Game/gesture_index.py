@@ -0,0 +1,104 @@
+import hashlib
+import os
+
+import numpy as np
+
+from classifier import landmark_features, squared_distances
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.gesture_cache')
+# Part of every cache key; bump when landmark extraction changes so stale entries are ignored
+EXTRACTOR_VERSION = 1
+# landmark_features: 21 (x, y) pairs per hand
+FEATURE_SIZE = 42
+# Squared feature distance beyond which a hand matches no reference. On synthetic hands rotated up
+# to 45 degrees, 99% land within 0.3 of their own gesture and 99% stay over 0.46 from any other.
+MAX_DISTANCE = 0.4
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_landmarks(detector, path):
+    # One image -> (hands, 21, 3) pixel landmarks and handedness labels; no hands if unreadable
+    import cv2
+    img = cv2.imread(path)
+    if img is None:
+        return np.zeros((0, 21, 3), dtype=np.float32), []
+    landmarks = detector.detect(img, draw=False)
+    return np.asarray(landmarks, dtype=np.float32).reshape(-1, 21, 3), list(detector.handedness)
+
+
+class ReferenceIndex:
+    # Reference embeddings (landmark_features of the gesture images) stacked into one matrix, so
+    # matching a batch of hands against every reference is a single matrix product however many
+    # gestures the library holds. Has the classifier predict() interface; hands further than
+    # max_distance from every reference come back as None.
+    def __init__(self, names, features, max_distance=MAX_DISTANCE):
+        self.names = np.asarray(names, dtype=object)
+        self.features = np.asarray(features, dtype=np.float32).reshape(len(self.names), FEATURE_SIZE)
+        self.max_distance = max_distance
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, landmarks, handedness=None):
+        # -> (names, squared distances), one per hand
+        if not len(landmarks) or not len(self.names):
+            return np.full(len(landmarks), None, dtype=object), np.full(len(landmarks), np.inf)
+        distances = squared_distances(landmark_features(landmarks, handedness), self.features)
+        nearest = distances.argmin(axis=1)
+        best = distances[np.arange(len(nearest)), nearest]
+        names = self.names[nearest]
+        if self.max_distance is not None:
+            names[best > self.max_distance] = None
+        return names, best
+
+    def predict(self, landmarks, handedness=None):
+        return self.match(landmarks, handedness)[0]
+
+
+def build_index(library, make_detector=None, cache_dir=CACHE_DIR, max_distance=MAX_DISTANCE):
+    # Embeds each gesture image of the library, reading the landmarks from the on-disk cache when
+    # an image with the same content was processed before; only cache misses build a detector
+    # (make_detector() -> a static-image HandDetector) and run it. An image without a detectable
+    # hand is cached as such too, so it isn't retried every startup.
+    # Returns the ReferenceIndex and {'images', 'cached', 'extracted', 'no_hand'}.
+    os.makedirs(cache_dir, exist_ok=True)
+    detector = None
+    names, features = [], []
+    stats = {'images': 0, 'cached': 0, 'extracted': 0, 'no_hand': []}
+    for gesture in library.gestures:
+        path = library.image_path(gesture)
+        if path is None:
+            continue
+        stats['images'] += 1
+        entry = os.path.join(cache_dir, f"{content_hash(path)}-v{EXTRACTOR_VERSION}.npz")
+        if os.path.exists(entry):
+            with np.load(entry) as data:
+                landmarks, handedness = data['landmarks'], list(data['handedness'])
+            stats['cached'] += 1
+        else:
+            if detector is None:
+                if make_detector is None:
+                    from hand_detector import HandDetector
+                    detector = HandDetector(mode=True, maxHands=1)
+                else:
+                    detector = make_detector()
+            landmarks, handedness = extract_landmarks(detector, path)
+            # Written under a temporary name first so an interrupted run never leaves half an entry
+            partial = entry + '.partial.npz'
+            np.savez(partial, landmarks=landmarks, handedness=np.array(handedness, dtype=str))
+            os.replace(partial, entry)
+            stats['extracted'] += 1
+        if not len(landmarks):
+            stats['no_hand'].append(gesture.name)
+            continue
+        names.append(gesture.name)
+        features.append(landmark_features(landmarks[:1], handedness[:1] or None)[0])
+    return ReferenceIndex(names, np.array(features, dtype=np.float32).reshape(len(names), FEATURE_SIZE),
+                          max_distance), stats
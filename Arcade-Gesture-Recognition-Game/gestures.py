@@ -0,0 +1,264 @@
+import collections
+import itertools
+import json
+import os
+
+import numpy as np
+
+FINGER_BITS = 5
+
+# gestures.json next to this file is the one place gestures are defined
+MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gestures.json')
+MANIFEST_VERSION = 1
+
+
+def encode_fingers(fingers):
+    # [thumb, index, middle, ring, pinky] -> 5-bit code with the thumb in the high bit.
+    # Works on (..., 5) arrays as well, giving one code per hand. A single hand is encoded with
+    # plain shifts: numpy's per-call overhead dwarfs five bits.
+    if isinstance(fingers, np.ndarray):
+        if fingers.ndim > 1:
+            return fingers.astype(np.int64) @ (1 << np.arange(FINGER_BITS - 1, -1, -1))
+        fingers = fingers.tolist()
+    elif fingers and isinstance(fingers[0], (list, tuple)):
+        return np.asarray(fingers, dtype=np.int64) @ (1 << np.arange(FINGER_BITS - 1, -1, -1))
+    code = 0
+    for bit in fingers:
+        code = (code << 1) | int(bit)
+    return code
+
+
+def encode_hands(hands):
+    # One hand keeps its plain 5-bit code. Several hands are concatenated, first hand in the
+    # high bits, under a leading marker bit so codes of different hand counts never collide.
+    codes = [encode_fingers(fingers) for fingers in hands]
+    if len(codes) == 1:
+        return codes[0]
+    code = 1
+    for hand_code in codes:
+        code = (code << FINGER_BITS) | hand_code
+    return code
+
+
+def encode_pattern(pattern):
+    if isinstance(pattern, np.ndarray):
+        several = pattern.ndim == 2
+    else:
+        several = bool(pattern) and isinstance(pattern[0], (list, tuple, np.ndarray))
+    return encode_hands(pattern) if several else encode_fingers(pattern)
+
+
+class GestureConflictError(ValueError):
+    pass
+
+
+class GestureTable:
+    # Finger-code -> gesture name, built once from {name: pattern}. A pattern is a five-item
+    # finger list, or a list of those for multi-hand gestures.
+    def __init__(self, gestures):
+        self.names = {}
+        for name, pattern in gestures.items():
+            code = encode_pattern(pattern)
+            if code in self.names:
+                raise GestureConflictError(
+                    f"Gestures '{self.names[code]}' and '{name}' share the finger pattern {pattern}")
+            self.names[code] = name
+        # Single-hand codes index straight into a dense array
+        self.single = np.full(1 << FINGER_BITS, None, dtype=object)
+        for code, name in self.names.items():
+            if code < len(self.single):
+                self.single[code] = name
+        # Every single-hand finger tuple, unknown ones included, so a per-frame lookup is one hash
+        # of five ints instead of an encode
+        self.by_fingers = {fingers: self.single[encode_fingers(fingers)]
+                           for fingers in itertools.product((0, 1), repeat=FINGER_BITS)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup_code(self, code):
+        if 0 <= code < len(self.single):
+            return self.single[code]
+        return self.names.get(code)
+
+    def lookup(self, fingers):
+        try:
+            return self.by_fingers[tuple(fingers)]
+        except (KeyError, TypeError):
+            # Multi-hand patterns (lists of lists aren't hashable) go through their code
+            return self.lookup_code(encode_pattern(fingers))
+
+    def lookup_codes(self, codes):
+        # Vectorised single-hand lookup, one name (or None) per code
+        return self.single[np.asarray(codes)]
+
+
+class ManifestError(ValueError):
+    pass
+
+
+# fingers: five-item finger list, or a list of those for multi-hand gestures; code: its finger
+# code; image: prompt/reference image path relative to the manifest, or None; prompt: whether the
+# game shows it as a prompt
+Gesture = collections.namedtuple('Gesture', ['name', 'fingers', 'code', 'image', 'prompt'])
+GESTURE_KEYS = {'name', 'fingers', 'image', 'prompt'}
+
+
+def _valid_hand(fingers):
+    return isinstance(fingers, list) and len(fingers) == FINGER_BITS and all(bit in (0, 1) for bit in fingers)
+
+
+def _valid_fingers(fingers):
+    return _valid_hand(fingers) or (isinstance(fingers, list) and len(fingers) > 1
+                                    and all(_valid_hand(hand) for hand in fingers))
+
+
+def _valid_name(name):
+    return isinstance(name, str) and bool(name.strip())
+
+
+def _check_entry(index, entry, base_dir, check_files):
+    # -> list of problems with one manifest entry
+    if not isinstance(entry, dict):
+        return [f"gesture #{index} is not an object"]
+    name = entry.get('name')
+    label = f"gesture #{index} ({name!r})" if name else f"gesture #{index}"
+    problems = [f"{label} has unknown key {key!r}" for key in sorted(set(entry) - GESTURE_KEYS)]
+    if not _valid_name(name):
+        problems.append(f"{label} needs a non-empty name")
+    fingers = entry.get('fingers')
+    if not _valid_fingers(fingers):
+        problems.append(f"{label} needs fingers as {FINGER_BITS} 0/1 values, or a list of those per hand; "
+                        f"got {fingers!r}")
+    image = entry.get('image')
+    if image is not None:
+        if not isinstance(image, str):
+            problems.append(f"{label} has a non-string image {image!r}")
+        elif check_files and not os.path.isfile(os.path.join(base_dir, image)):
+            problems.append(f"{label} image {image!r} does not exist")
+    if not isinstance(entry.get('prompt', True), bool):
+        problems.append(f"{label} prompt must be true or false")
+    elif entry.get('prompt') and image is None:
+        problems.append(f"{label} is a prompt but has no image")
+    return problems
+
+
+class GestureLibrary:
+    # Every gesture the game knows, loaded from one JSON manifest and checked as a whole: all
+    # problems (bad finger patterns, duplicate names or codes, missing images) are raised together
+    # in one ManifestError. Builds the finger-code table once; reference landmark embeddings of the
+    # images are indexed separately by gesture_index.build_index().
+    def __init__(self, gestures, image_dir='.', source=None):
+        self.gestures = gestures
+        self.image_dir = image_dir
+        self.source = source
+        self.by_name = {gesture.name: gesture for gesture in gestures}
+        self.patterns = {gesture.name: gesture.fingers for gesture in gestures}
+        # Prompt image -> gesture name, in manifest order
+        self.prompts = {gesture.image: gesture.name for gesture in gestures if gesture.prompt}
+        self.table = GestureTable(self.patterns)
+
+    def __len__(self):
+        return len(self.gestures)
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def image_path(self, gesture):
+        return os.path.join(self.image_dir, gesture.image) if gesture.image else None
+
+    @classmethod
+    def from_manifest(cls, data, base_dir='.', check_files=True, source=None):
+        if not isinstance(data, dict) or not isinstance(data.get('gestures'), list):
+            raise ManifestError(f"{source or 'manifest'}: expected an object with a \"gestures\" list")
+        if data.get('version', 1) != MANIFEST_VERSION:
+            raise ManifestError(f"{source or 'manifest'}: unsupported version {data.get('version')!r}")
+        problems = []
+        gestures = []
+        names = {}
+        codes = {}
+        for index, entry in enumerate(data['gestures']):
+            problems += _check_entry(index, entry, base_dir, check_files)
+            if not isinstance(entry, dict) or not _valid_name(entry.get('name')) or \
+                    not _valid_fingers(entry.get('fingers')):
+                continue
+            name = entry['name']
+            code = encode_pattern(entry['fingers'])
+            if name in names:
+                problems.append(f"gesture #{index} repeats the name {name!r} of gesture #{names[name]}")
+            if code in codes:
+                problems.append(f"gesture #{index} ({name!r}) has the same fingers as {codes[code]!r}")
+            names.setdefault(name, index)
+            codes.setdefault(code, name)
+            gestures.append(Gesture(name, entry['fingers'], code, entry.get('image'),
+                                    entry.get('prompt', entry.get('image') is not None)))
+        if problems:
+            raise ManifestError(f"{source or 'manifest'}: " + '; '.join(problems))
+        return cls(gestures, base_dir, source)
+
+
+def load_library(path=MANIFEST, check_files=True):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except ValueError as e:
+        raise ManifestError(f"{path}: not valid JSON ({e})") from None
+    return GestureLibrary.from_manifest(data, os.path.dirname(os.path.abspath(path)), check_files, path)
+
+
+class ConsistencyTracker:
+    # Captures a gesture once it has been held for hold_time seconds. A held hand pose that is
+    # not one of the expected gestures is captured as "Random". Time comes from the caller so
+    # recorded sessions can be replayed on a simulated clock.
+    def __init__(self, expected_gestures, hold_time=1.0, cooldown=0.0):
+        self.expected_gestures = set(expected_gestures)
+        self.hold_time = hold_time
+        self.cooldown = cooldown
+        self.reset()
+
+    def reset(self):
+        self.consistent_gesture_start = None
+        self.consistent_gesture = None
+        self.resume_at = None
+
+    def update(self, hand_found, gesture_name, now):
+        if not hand_found:
+            return None
+        if self.resume_at is not None and now < self.resume_at:
+            return None
+
+        if self.consistent_gesture_start is None or gesture_name != self.consistent_gesture:
+            self.consistent_gesture_start = now
+            self.consistent_gesture = gesture_name
+            return None
+        if now - self.consistent_gesture_start < self.hold_time:
+            return None
+
+        self.reset()
+        self.resume_at = now + self.cooldown
+        if gesture_name and gesture_name in self.expected_gestures:
+            return gesture_name
+        return "Random"
+
+
+_default_library = None
+
+
+def default_library():
+    # The bundled library, loaded on first use and shared. Its images aren't checked: code that
+    # only needs the default gestures' names and patterns shouldn't fail over a missing picture.
+    # The game loads its library with load_library() and passes it on instead.
+    global _default_library
+    if _default_library is None:
+        _default_library = load_library(check_files=False)
+    return _default_library
+
+
+def __getattr__(name):
+    # PREDEFINED_GESTURES ({name: fingers}) and IMAGE_TO_GESTURE ({prompt image: name}) of the
+    # bundled library, so importing this module doesn't read the manifest
+    if name == 'PREDEFINED_GESTURES':
+        return default_library().patterns
+    if name == 'IMAGE_TO_GESTURE':
+        return default_library().prompts
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,276 @@
+import time
+
+import cv2
+import numpy as np
+
+from instrumentation import DISABLED
+
+TIP_IDS = np.array([4, 8, 12, 16, 20])
+FINGER_TIPS = TIP_IDS[1:]
+FINGER_PIPS = TIP_IDS[1:] - 2
+POINT_COLOR = (255, 255, 130)
+# MediaPipe labels handedness as if the image were mirrored (a selfie view), but it is given the
+# unmirrored camera frame, so a player's right hand comes back as "Left". Held up palm to the
+# camera, that hand's extended thumb points towards +x, the original fingersUp rule; the player's
+# left hand, labelled "Right", points it towards -x.
+THUMB_DIRECTION = {'Left': 1, 'Right': -1}
+# A serialized NormalizedLandmarkList whose landmarks hold only x, y and z: one 17-byte record per
+# landmark, a length-prefixed submessage of three tagged little-endian floats. LANDMARK_TAGS are
+# the (offset, byte) pairs every record must have for the layout to apply.
+LANDMARK_RECORD = np.dtype({'names': ['x', 'y', 'z'], 'formats': ['<f4'] * 3, 'offsets': [3, 8, 13],
+                            'itemsize': 17})
+LANDMARK_TAGS = [(0, b'\x0a'), (1, b'\x0f'), (2, b'\x0d'), (7, b'\x15'), (12, b'\x1d')]
+
+
+def draw_points(img, landmarks, rgb=False):
+    color = POINT_COLOR[::-1] if rgb else POINT_COLOR
+    for cx, cy in landmarks[..., :2].reshape(-1, 2).astype(int):
+        cv2.circle(img, (int(cx), int(cy)), 7, color, cv2.FILLED)
+
+
+def landmark_array(hand_landmarks):
+    # NormalizedLandmarkList protos -> (hands, 21, 3) float32 normalised coordinates. Reading the
+    # serialized bytes as a numpy record array avoids a Python attribute read per coordinate; any
+    # other layout (extra visibility or presence fields, say) takes the per-landmark path.
+    data = b''.join(hand.SerializeToString() for hand in hand_landmarks)
+    count = len(hand_landmarks) * 21
+    size = LANDMARK_RECORD.itemsize
+    if len(data) == count * size and all(data[offset::size] == tag * count for offset, tag in LANDMARK_TAGS):
+        records = np.frombuffer(data, dtype=LANDMARK_RECORD).reshape(len(hand_landmarks), 21)
+        landmarks = np.empty((len(hand_landmarks), 21, 3), dtype=np.float32)
+        landmarks[..., 0] = records['x']
+        landmarks[..., 1] = records['y']
+        landmarks[..., 2] = records['z']
+        return landmarks
+    return np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hand_landmarks], dtype=np.float32)
+
+
+def fingers_up(landmarks, handedness=None):
+    # landmarks: (hands, 21, 3) pixel coordinates -> (hands, 5) uint8 finger states.
+    # Coordinates are truncated like findPosition so the result matches fingersUp exactly.
+    # With handedness labels the thumb test is mirrored for the player's left hands.
+    lm = np.trunc(landmarks[..., :2])
+    fingers = np.empty(lm.shape[:-2] + (5,), dtype=np.uint8)
+
+    # Thumb
+    thumb = lm[..., TIP_IDS[0], 0] - lm[..., TIP_IDS[0] - 1, 0]
+    if handedness is not None:
+        thumb = thumb * np.array([THUMB_DIRECTION.get(label, 1) for label in handedness])
+    fingers[..., 0] = thumb > 0
+
+    # Fingers
+    fingers[..., 1:] = lm[..., FINGER_TIPS, 1] < lm[..., FINGER_PIPS, 1]
+    return fingers
+
+
+class HandDetector:
+    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5,
+                 roi=False, roiPadding=0.3, inferenceWidth=None, classifier=None, roiHands=1, roiRescan=15):
+        self.mode = mode
+        self.maxHands = maxHands
+        self.detectionCon = detectionCon
+        self.trackCon = trackCon
+        # Adaptive mode: crop to the hand found last frame and/or downscale before inference
+        self.roi = roi
+        self.roiPadding = roiPadding
+        # Hands the crop should hold (one per player). While it holds fewer, every roiRescan-th frame
+        # searches the full frame instead, so a hand appearing outside the crop is still found.
+        self.roiHands = roiHands
+        self.roiRescan = roiRescan
+        self.inferenceWidth = inferenceWidth
+        self.roiBox = None
+        self.roiHandCount = 0
+        self.roiSinceFull = 0
+        self.stats = {'frames': 0, 'roi_frames': 0, 'roi_hits': 0, 'full_frames': 0, 'rescans': 0,
+                      'inference_time': 0.0}
+        # Imported here: mediapipe takes about a second to import, and the helpers above
+        # (fingers_up, draw_points) are used by code that never builds a detector
+        import mediapipe as mp
+        self.mpHands = mp.solutions.hands
+        self.hands = self.mpHands.Hands(static_image_mode=self.mode, max_num_hands=self.maxHands,
+                                        min_detection_confidence=self.detectionCon,
+                                        min_tracking_confidence=self.trackCon)
+        self.mpDraw = mp.solutions.drawing_utils
+        # MediaPipe's default landmark colour is BGR red; this keeps it red on RGB frames
+        self.rgbLandmarkSpec = self.mpDraw.DrawingSpec(color=(255, 0, 0))
+        self.recorder = None
+        self.handedness = []
+        # Anything with predict(landmarks, handedness) -> gesture names (see classifier.py);
+        # None keeps the fingersUp heuristic
+        self.classifier = classifier
+        self.instrumentation = DISABLED
+
+    def warmUp(self, size=(640, 480)):
+        # One inference on a blank frame so graph initialisation isn't paid on the first camera frame.
+        # Bypasses findHands so stats, recordings and stage timings only see real frames.
+        self.hands.process(np.zeros((size[1], size[0], 3), dtype=np.uint8))
+
+    def findHands(self, img, draw=True, timestamp=None, imgRGB=None):
+        # imgRGB: an RGB copy of img the caller already made (e.g. for display). It is used for
+        # inference instead of converting again, and landmarks are drawn on it rather than img.
+        start = time.perf_counter()
+        if self.roi or self.inferenceWidth:
+            self.results = self._processAdaptive(img if imgRGB is None else imgRGB, imgRGB is not None)
+        else:
+            rgb = imgRGB
+            if rgb is None:
+                with self.instrumentation.stage('convert'):
+                    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            with self.instrumentation.stage('mediapipe'):
+                self.results = self.hands.process(rgb)
+            self.stats['full_frames'] += 1
+        self.stats['frames'] += 1
+        self.stats['inference_time'] += time.perf_counter() - start
+        if self.recorder is not None:
+            self.recorder.record(self.results, (img.shape[1], img.shape[0]), timestamp)
+
+        if self.results.multi_hand_landmarks:
+            for handLms in self.results.multi_hand_landmarks:
+                if draw and imgRGB is not None:
+                    self.mpDraw.draw_landmarks(imgRGB, handLms, self.mpHands.HAND_CONNECTIONS, self.rgbLandmarkSpec)
+                elif draw:
+                    self.mpDraw.draw_landmarks(img, handLms, self.mpHands.HAND_CONNECTIONS)
+        return img
+
+    def _processRegion(self, region, isRGB=False):
+        if self.inferenceWidth and region.shape[1] > self.inferenceWidth:
+            scale = self.inferenceWidth / region.shape[1]
+            region = cv2.resize(region, (self.inferenceWidth, max(1, round(region.shape[0] * scale))),
+                                interpolation=cv2.INTER_AREA)
+        if not isRGB:
+            with self.instrumentation.stage('convert'):
+                region = cv2.cvtColor(region, cv2.COLOR_BGR2RGB)
+        with self.instrumentation.stage('mediapipe'):
+            return self.hands.process(region)
+
+    def _processAdaptive(self, img, isRGB=False):
+        h, w = img.shape[:2]
+        if self.roi and self.roiBox is not None:
+            if self.roiHandCount < self.roiHands and self.roiSinceFull >= self.roiRescan:
+                # Fewer hands in the crop than players for a while: look for the others everywhere
+                self.stats['rescans'] += 1
+            else:
+                results = self._processRoi(img, isRGB, w, h)
+                if results is not None:
+                    return results
+
+        results = self._processRegion(img, isRGB)
+        self.stats['full_frames'] += 1
+        self.roiSinceFull = 0
+        if self.roi:
+            self._updateRoi(results, w, h)
+        return results
+
+    def _processRoi(self, img, isRGB, w, h):
+        # Inference on the crop only; None when the hand was lost
+        self.roiSinceFull += 1
+        x0, y0, x1, y1 = self.roiBox
+        results = self._processRegion(img[y0:y1, x0:x1], isRGB)
+        self.stats['roi_frames'] += 1
+        if not results.multi_hand_landmarks:
+            # Hand lost: the caller falls back to full-frame detection on this same frame
+            self.roiBox = None
+            return None
+        self.stats['roi_hits'] += 1
+        # Crop-relative landmarks back to full-frame normalised coordinates
+        sx, sy = (x1 - x0) / w, (y1 - y0) / h
+        for handLms in results.multi_hand_landmarks:
+            for lm in handLms.landmark:
+                lm.x = x0 / w + lm.x * sx
+                lm.y = y0 / h + lm.y * sy
+                lm.z = lm.z * sx
+        self._updateRoi(results, w, h)
+        return results
+
+    def _updateRoi(self, results, w, h):
+        self.roiHandCount = len(results.multi_hand_landmarks or [])
+        if not results.multi_hand_landmarks:
+            self.roiBox = None
+            return
+        xs = [lm.x for handLms in results.multi_hand_landmarks for lm in handLms.landmark]
+        ys = [lm.y for handLms in results.multi_hand_landmarks for lm in handLms.landmark]
+        hx0, hy0, hx1, hy1 = min(xs) * w, min(ys) * h, max(xs) * w, max(ys) * h
+
+        # Keep the current crop while the hand stays well inside it. A moving crop shifts the
+        # image under MediaPipe's own tracker, which then drops back to slow palm detection.
+        if self.roiBox is not None:
+            x0, y0, x1, y1 = self.roiBox
+            margin = self.roiPadding * 0.5 * max(hx1 - hx0, hy1 - hy0)
+            if hx0 - margin >= x0 and hy0 - margin >= y0 and hx1 + margin <= x1 and hy1 + margin <= y1:
+                return
+
+        pad = self.roiPadding * max(hx1 - hx0, hy1 - hy0, 32)
+        x0, y0 = max(0, int(hx0 - pad)), max(0, int(hy0 - pad))
+        x1, y1 = min(w, int(hx1 + pad)), min(h, int(hy1 + pad))
+        self.roiBox = (x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None
+
+    def inferenceStats(self):
+        frames = self.stats['frames'] or 1
+        roi_frames = self.stats['roi_frames']
+        return {
+            'frames': self.stats['frames'],
+            'roi_hit_rate': self.stats['roi_hits'] / roi_frames if roi_frames else 0.0,
+            'full_frame_inferences': self.stats['full_frames'],
+            'roi_rescans': self.stats['rescans'],
+            'mean_inference_ms': 1000 * self.stats['inference_time'] / frames,
+        }
+
+    def findPosition(self, img, handNo=0, draw=True):
+        lmlist = []
+        if self.results.multi_hand_landmarks:
+            myHand = self.results.multi_hand_landmarks[handNo]
+            for id, lm in enumerate(myHand.landmark):
+                h, w, c = img.shape
+                cx, cy = int(lm.x * w), int(lm.y * h)
+                lmlist.append((id, cx, cy))
+                if draw:
+                    cv2.circle(img, (cx, cy), 7, (255, 255, 130), cv2.FILLED)
+        return lmlist
+
+    def fingersUp(self, lmlist):
+        fingers = []
+        tipIds = [4, 8, 12, 16, 20]
+
+        # Thumb
+        if lmlist[tipIds[0]][1] > lmlist[tipIds[0] - 1][1]:
+            fingers.append(1)
+        else:
+            fingers.append(0)
+
+        # Fingers
+        for id in range(1, 5):
+            if lmlist[tipIds[id]][2] < lmlist[tipIds[id] - 2][2]:
+                fingers.append(1)
+            else:
+                fingers.append(0)
+        return fingers
+
+    def findLandmarks(self, img, draw=True):
+        with self.instrumentation.stage('landmarks'):
+            return self._findLandmarks(img, draw)
+
+    def _findLandmarks(self, img, draw):
+        # All detected hands as one (hands, 21, 3) float32 array in pixel coordinates
+        h, w = img.shape[:2]
+        if not self.results.multi_hand_landmarks:
+            self.landmarks = np.empty((0, 21, 3), dtype=np.float32)
+            self.handedness = []
+            return self.landmarks
+
+        landmarks = landmark_array(self.results.multi_hand_landmarks)
+        landmarks *= np.array([w, h, w], dtype=np.float32)
+        if draw:
+            draw_points(img, landmarks)
+        self.landmarks = landmarks
+        self.handedness = [hand.classification[0].label for hand in self.results.multi_handedness or []]
+        return landmarks
+
+    def detect(self, img, draw=True, timestamp=None, imgRGB=None):
+        self.findHands(img, draw, timestamp, imgRGB)
+        landmarks = self.findLandmarks(img, draw=False)
+        if draw:
+            draw_points(img if imgRGB is None else imgRGB, landmarks, rgb=imgRGB is not None)
+        return landmarks
+
+    def fingersUpBatch(self, landmarks, handedness=None):
+        return fingers_up(landmarks, handedness)
@@ -0,0 +1,54 @@
+import numpy as np
+
+# Wrist and middle-finger knuckle: a steady centre for a hand whatever the fingers do
+ANCHOR_IDS = [0, 9]
+
+
+class HandTracker:
+    # Gives each detected hand a stable integer ID across frames by greedily matching hand
+    # centres to the tracks seen last frame. Tracks survive max_missing frames without a match.
+    def __init__(self, max_distance=0.2, max_missing=10):
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.tracks = {}
+        self.next_id = 0
+
+    def update(self, landmarks, frame_size):
+        # landmarks: (hands, 21, 3) pixel coordinates -> list of track IDs, one per hand
+        w, h = frame_size
+        centres = landmarks[:, ANCHOR_IDS, :2].mean(axis=1) / np.array([w, h], dtype=np.float32)
+        ids = [None] * len(centres)
+
+        track_ids = list(self.tracks)
+        if track_ids and len(centres):
+            previous = np.array([self.tracks[tid]['centre'] for tid in track_ids])
+            distances = np.linalg.norm(centres[:, None, :] - previous[None, :, :], axis=-1)
+            for flat in np.argsort(distances, axis=None):
+                hand, track = np.unravel_index(flat, distances.shape)
+                if distances[hand, track] > self.max_distance:
+                    break
+                if ids[hand] is None and track_ids[track] is not None:
+                    ids[hand] = track_ids[track]
+                    track_ids[track] = None
+
+        for hand, centre in enumerate(centres):
+            if ids[hand] is None:
+                ids[hand] = self.next_id
+                self.tracks[self.next_id] = {'centre': centre, 'missing': 0, 'born': centre.copy()}
+                self.next_id += 1
+            else:
+                self.tracks[ids[hand]]['centre'] = centre
+                self.tracks[ids[hand]]['missing'] = 0
+
+        seen = set(ids)
+        for tid in list(self.tracks):
+            if tid not in seen:
+                self.tracks[tid]['missing'] += 1
+                if self.tracks[tid]['missing'] > self.max_missing:
+                    del self.tracks[tid]
+        return ids
+
+    def player_for(self, track_id, players):
+        # Player slots split the frame into vertical strips, fixed by where the hand first appeared
+        x = self.tracks[track_id]['born'][0]
+        return min(int(x * players), players - 1)
@@ -0,0 +1,189 @@
+import contextlib
+import cProfile
+import csv
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+NULL_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.record(self.name, time.perf_counter() - self.start)
+
+
+class RollingHistogram:
+    # Last `window` samples in a ring buffer, plus all-time count and total
+    def __init__(self, window):
+        self.samples = np.zeros(window)
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+        self.total += seconds
+
+    def percentiles(self, qs=(50, 95, 99)):
+        filled = self.samples[:min(self.count, len(self.samples))]
+        if not len(filled):
+            return [0.0] * len(qs)
+        return list(np.percentile(filled, qs))
+
+
+class Instrumentation:
+    # Per-stage monotonic timers with rolling p50/p95/p99, an optional on-screen overlay, JSON/CSV
+    # export and opt-in cProfile/tracemalloc. When disabled, stage() hands back a shared no-op
+    # context manager and record() returns immediately.
+    # Milestones are one-off times since `origin` (defaulting to construction), such as
+    # time-to-first-frame; unlike stage histograms they survive reset().
+    def __init__(self, enabled=True, window=1000, profile=False, trace_memory=False, origin=None):
+        self.enabled = enabled
+        self.origin = time.perf_counter() if origin is None else origin
+        self.milestones = {}
+        self.window = window
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.lock = threading.Lock()
+        self.profiler = None
+        self.memory_snapshot = None
+        self.overlay_font = None
+        self.overlay_surface = None
+        self.overlay_updated = 0.0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.started = time.perf_counter()
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = RollingHistogram(self.window)
+            histogram.add(seconds)
+
+    def milestone(self, name):
+        # Only the first call for each name counts, so this is safe to call every frame
+        if not self.enabled or name in self.milestones:
+            return
+        with self.lock:
+            self.milestones.setdefault(name, time.perf_counter() - self.origin)
+
+    def start_profiling(self):
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def stop_profiling(self, top=15):
+        if self.profiler:
+            self.profiler.disable()
+            pstats.Stats(self.profiler).sort_stats('cumulative').print_stats(top)
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.memory_snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Python memory: {current / 1e6:.1f} MB now, {peak / 1e6:.1f} MB peak")
+            for stat in self.memory_snapshot.statistics('lineno')[:top]:
+                print(f"  {stat}")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        with self.lock:
+            stages = {}
+            for name, histogram in self.stages.items():
+                p50, p95, p99 = histogram.percentiles()
+                stages[name] = {
+                    'count': histogram.count,
+                    'mean_ms': 1000 * histogram.total / histogram.count,
+                    'p50_ms': 1000 * p50,
+                    'p95_ms': 1000 * p95,
+                    'p99_ms': 1000 * p99,
+                    'max_fps': histogram.count / histogram.total if histogram.total > 0 else 0.0,
+                }
+        return elapsed, stages
+
+    def report(self, dropped=None):
+        if not self.enabled:
+            return
+        elapsed, stages = self.summary()
+        if self.milestones:
+            print("Startup: " + ", ".join(f"{name} {1000 * t:.0f} ms" for name, t in self.milestones.items()))
+        print(f"Stage timings over {elapsed:.1f}s:")
+        print(f"  {'stage':<10} {'frames':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  ms")
+        for name, s in stages.items():
+            print(f"  {name:<10} {s['count']:>6} {s['mean_ms']:8.2f} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} "
+                  f"{s['p99_ms']:8.2f}  (stage limit {s['max_fps']:.1f} fps)")
+        if 'render' in stages and elapsed > 0:
+            print(f"  end-to-end {stages['render']['count'] / elapsed:.1f} fps")
+        if dropped:
+            for name, count in dropped.items():
+                print(f"  dropped {count} stale frames at {name}")
+
+    def export(self, path, **extra):
+        elapsed, stages = self.summary()
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_fps'])
+                for name, s in stages.items():
+                    writer.writerow([name, s['count'], round(s['mean_ms'], 4), round(s['p50_ms'], 4),
+                                     round(s['p95_ms'], 4), round(s['p99_ms'], 4), round(s['max_fps'], 2)])
+        else:
+            with open(path, 'w') as f:
+                json.dump({'elapsed_s': elapsed, 'stages': stages,
+                           'startup_ms': {name: 1000 * t for name, t in self.milestones.items()}, **extra}, f, indent=2)
+
+    def draw_overlay(self, win, interval=0.25):
+        # Small p50/p95 table in the top-left corner, re-rendered a few times a second.
+        # Returns the rectangle drawn so callers can push just that to the display.
+        if not self.enabled:
+            return None
+        # Imported here so headless tools using the timers don't pull in pygame
+        import pygame
+
+        now = time.perf_counter()
+        if self.overlay_surface is None or now - self.overlay_updated >= interval:
+            if self.overlay_font is None:
+                self.overlay_font = pygame.font.Font(None, 22)
+            _, stages = self.summary()
+            lines = [f"{name:<10} p50 {s['p50_ms']:6.1f}  p95 {s['p95_ms']:6.1f} ms" for name, s in stages.items()]
+            line_height = self.overlay_font.get_linesize()
+            width = max([self.overlay_font.size(line)[0] for line in lines] + [1])
+            self.overlay_surface = pygame.Surface((width + 12, line_height * len(lines) + 12))
+            self.overlay_surface.fill((0, 0, 0))
+            for i, line in enumerate(lines):
+                self.overlay_surface.blit(self.overlay_font.render(line, True, (255, 255, 255)),
+                                          (6, 6 + i * line_height))
+            self.overlay_updated = now
+        return win.blit(self.overlay_surface, (10, 10))
+
+
+DISABLED = Instrumentation(enabled=False)
@@ -0,0 +1,167 @@
+import argparse
+import collections
+import csv
+import glob
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+
+from classifier import load_classifier
+from gestures import MANIFEST, encode_fingers, load_library
+from hand_detector import HandDetector, fingers_up
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+FIELDS = ['path', 'label', 'predicted', 'correct', 'hands', 'handedness', 'inference_ms', 'error']
+
+# One detector (with its classifier, if any) and gesture table per worker process, built by
+# init_worker after the fork
+_detector = None
+_table = None
+
+
+def collect_images(sources):
+    # Files, globs and directories (searched recursively) -> sorted image paths
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                paths += [os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS)]
+        elif any(ch in source for ch in '*?['):
+            paths += glob.glob(source, recursive=True)
+        else:
+            paths.append(source)
+    return sorted(set(paths))
+
+
+def label_for(path, library, library_images):
+    # The library's own images are labelled from the manifest; datasets by a directory named after
+    # the gesture
+    name = library_images.get(os.path.abspath(path))
+    if name:
+        return name
+    parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    return parent if parent in library.patterns else ''
+
+
+def init_worker(table, classifier_path=None, max_hands=1, inference_width=None):
+    # table: the GestureTable of the library loaded by main(), so workers don't re-read the manifest
+    global _detector, _table
+    # Parallelism comes from the pool; threads inside each worker would only contend for cores
+    cv2.setNumThreads(1)
+    _detector = HandDetector(mode=True, maxHands=max_hands, inferenceWidth=inference_width,
+                             classifier=load_classifier(classifier_path) if classifier_path else None)
+    _table = table
+
+
+def label_image(item):
+    path, label = item
+    row = {'path': path, 'label': label, 'predicted': '', 'correct': '', 'hands': 0, 'handedness': '',
+           'inference_ms': '', 'error': ''}
+    img = cv2.imread(path)
+    if img is None:
+        row['error'] = 'unreadable'
+        return row
+
+    start = time.perf_counter()
+    landmarks = _detector.detect(img, draw=False)
+    if len(landmarks):
+        # The same rule as game.process_frame: a learned model gets the handedness label, the
+        # finger rules test the thumb as for a right hand
+        handedness = _detector.handedness[:1]
+        if _detector.classifier:
+            row['predicted'] = _detector.classifier.predict(landmarks[:1], handedness or None)[0] or ''
+        else:
+            row['predicted'] = _table.lookup_code(int(encode_fingers(fingers_up(landmarks[:1])[0]))) or ''
+        row['handedness'] = handedness[0] if handedness else ''
+    row['inference_ms'] = round(1000 * (time.perf_counter() - start), 2)
+    row['hands'] = len(landmarks)
+    if label:
+        row['correct'] = int(row['predicted'] == label)
+    return row
+
+
+def precision_recall(rows):
+    # Per-gesture precision and recall over the labelled rows; a missed hand counts against recall
+    true_positives = collections.Counter()
+    predicted = collections.Counter()
+    actual = collections.Counter()
+    for row in rows:
+        if not row['label']:
+            continue
+        actual[row['label']] += 1
+        if row['predicted']:
+            predicted[row['predicted']] += 1
+            true_positives[row['predicted']] += row['predicted'] == row['label']
+    return {gesture: (true_positives[gesture] / predicted[gesture] if predicted[gesture] else None,
+                      true_positives[gesture] / actual[gesture] if actual[gesture] else None,
+                      actual[gesture])
+            for gesture in sorted(set(actual) | set(predicted))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run hand detection and gesture classification over image '
+                                                 'datasets in parallel and score them against their labels')
+    parser.add_argument('sources', nargs='*',
+                        help='image files, globs or directories (images under a directory named after a gesture '
+                             'are labelled with it); defaults to the gesture library\'s images')
+    parser.add_argument('--out', default='labels.csv', help='CSV file written as results come in')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker processes, each with its own MediaPipe graph; 0 runs in this process')
+    parser.add_argument('--chunk-size', type=int, default=8, help='images handed to a worker at a time')
+    parser.add_argument('--classifier', metavar='MODEL',
+                        help='model from train_classifier.py to use instead of the finger rules')
+    parser.add_argument('--inference-width', type=int, metavar='PIXELS', help='downscale images before inference')
+    parser.add_argument('--gestures', metavar='MANIFEST', default=MANIFEST, help='gesture library to label with')
+    args = parser.parse_args()
+
+    library = load_library(args.gestures)
+    library_images = {os.path.abspath(library.image_path(gesture)): gesture.name
+                      for gesture in library.gestures if gesture.image}
+    sources = args.sources or list(library_images)
+    items = [(path, label_for(path, library, library_images)) for path in collect_images(sources)]
+    if not items:
+        sys.exit("No images found")
+
+    initargs = (library.table, args.classifier, 1, args.inference_width)
+    rows = []
+    start = time.perf_counter()
+    with open(args.out, 'w', newline='') as f:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+        if args.workers:
+            pool = multiprocessing.Pool(args.workers, init_worker, initargs)
+            results = pool.imap_unordered(label_image, items, chunksize=args.chunk_size)
+        else:
+            pool = None
+            init_worker(*initargs)
+            results = map(label_image, items)
+        try:
+            for row in results:
+                writer.writerow(row)
+                rows.append(row)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+    elapsed = time.perf_counter() - start
+
+    labelled = [row for row in rows if row['label']]
+    errors = sum(1 for row in rows if row['error'])
+    workers = f"{args.workers} worker processes" if args.workers else "in process"
+    print(f"{len(rows)} images in {elapsed:.1f}s ({len(rows) / elapsed:.1f} images/s, {workers}), "
+          f"{errors} unreadable, hands found in {sum(1 for row in rows if row['hands'])}")
+    if labelled:
+        accuracy = sum(row['correct'] == 1 for row in labelled) / len(labelled)
+        print(f"Accuracy {accuracy:.1%} over {len(labelled)} labelled images")
+        print(f"  {'gesture':<20} {'precision':>9} {'recall':>7} {'images':>7}")
+        for gesture, (precision, recall, support) in precision_recall(rows).items():
+            print(f"  {gesture:<20} {'-' if precision is None else f'{precision:.1%}':>9} "
+                  f"{'-' if recall is None else f'{recall:.1%}':>7} {support:>7}")
+    print(f"Results written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b'GLMK'
+VERSION = 1
+# magic, version, max_hands, frame width, frame height, padded to a fixed 32 bytes
+HEADER = struct.Struct('<4sHHII16x')
+HANDEDNESS = {'Left': 0, 'Right': 1}
+HANDEDNESS_LABELS = {0: 'Left', 1: 'Right'}
+
+
+def record_dtype(max_hands):
+    # One fixed-width record per processed frame. Landmarks are MediaPipe's normalised x, y, z;
+    # slots past `hands` are zero and handedness -1.
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('hands', 'u1'),
+        ('handedness', 'i1', (max_hands,)),
+        ('score', '<f4', (max_hands,)),
+        ('landmarks', '<f4', (max_hands, 21, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    # Appends detector results to a .lmk file, buffering records and writing them in batches
+    def __init__(self, path, max_hands=2, batch_size=256):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self.buffer = np.zeros(batch_size, dtype=self.dtype)
+        self.pending = 0
+        self.count = 0
+        self.file = None
+
+    def record(self, results, frame_size, timestamp=None):
+        if self.file is None:
+            self.file = open(self.path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION, self.max_hands, frame_size[0], frame_size[1]))
+
+        rec = self.buffer[self.pending]
+        rec['timestamp'] = time.time() if timestamp is None else timestamp
+        rec['handedness'] = -1
+        rec['score'] = 0
+        rec['landmarks'] = 0
+        hands = results.multi_hand_landmarks or []
+        handedness = results.multi_handedness or []
+        rec['hands'] = min(len(hands), self.max_hands)
+        for i, handLms in enumerate(hands[:self.max_hands]):
+            rec['landmarks'][i] = [(lm.x, lm.y, lm.z) for lm in handLms.landmark]
+            if i < len(handedness):
+                classification = handedness[i].classification[0]
+                rec['handedness'][i] = HANDEDNESS.get(classification.label, -1)
+                rec['score'][i] = classification.score
+
+        self.pending += 1
+        self.count += 1
+        if self.pending == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if self.file is not None and self.pending:
+            self.buffer[:self.pending].tofile(self.file)
+            self.file.flush()
+            self.pending = 0
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def open_recording(path):
+    # Returns the header fields and a read-only memmap over every record, without copying
+    with open(path, 'rb') as f:
+        magic, version, max_hands, width, height = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a landmark recording")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported recording version {version}")
+
+    header = {'max_hands': max_hands, 'width': width, 'height': height}
+    if os.path.getsize(path) == HEADER.size:
+        return header, np.zeros(0, dtype=record_dtype(max_hands))
+    records = np.memmap(path, dtype=record_dtype(max_hands), mode='r', offset=HEADER.size)
+    return header, records
+
+
+def pixel_landmarks(header, records):
+    # Normalised landmarks -> pixel coordinates, as HandDetector.findLandmarks returns them
+    scale = np.array([header['width'], header['height'], header['width']], dtype=np.float32)
+    return records['landmarks'] * scale
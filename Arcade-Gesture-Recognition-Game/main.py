@@ -1,297 +1,232 @@
-import cv2
-import os
-import random
 import time
-import mediapipe as mp
-import pygame
 
-pygame.mixer.init()
-pygame.init()
-pygame.font.init()
+# Startup milestones (time to splash, first inference, capture start, first frame) are measured from here
+STARTED = time.perf_counter()
 
-# Create a Pygame window
-win = pygame.display.set_mode((1440, 850))
+import argparse  # noqa: E402
+import os  # noqa: E402
 
-cheering_sound = pygame.mixer.Sound("cheering.mp3")
-clapping_sound = pygame.mixer.Sound("claps.mp3")
-over_sound = pygame.mixer.Sound("game-over.mp3")
-beep_sound = pygame.mixer.Sound("beep_sound.mp3")
+import pygame  # noqa: E402
 
+from audio import BUFFER, AudioEngine, configure_mixer  # noqa: E402
+from startup import Warmup, show_splash  # noqa: E402
 
-class HandDetector:
-    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5):
-        self.mode = mode
-        self.maxHands = maxHands
-        self.detectionCon = detectionCon
-        self.trackCon = trackCon
-        self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(static_image_mode=self.mode, max_num_hands=self.maxHands,
-                                        min_detection_confidence=self.detectionCon,
-                                        min_tracking_confidence=self.trackCon)
-        self.mpDraw = mp.solutions.drawing_utils
+# A copy of capture.FORMATS (tests/test_main.py checks they match): importing capture here would load cv2,
+# about 0.15 s, before the splash is up. It is imported with the game modules once the splash is showing.
+CAPTURE_FORMATS = ('MJPG', 'YUYV')
+SOUNDS = {'cheering': "cheering.mp3", 'clapping': "claps.mp3", 'over': "game-over.mp3", 'beep': "beep_sound.mp3"}
 
-    def findHands(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
 
-        if self.results.multi_hand_landmarks:
-            for handLms in self.results.multi_hand_landmarks:
-                if draw:
-                    self.mpDraw.draw_landmarks(img, handLms, self.mpHands.HAND_CONNECTIONS)
-        return img
+def parse_size(text):
+    # "640x480" -> (640, 480)
+    width, sep, height = text.lower().partition('x')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    return int(width), int(height)
 
-    def findPosition(self, img, handNo=0, draw=True):
-        lmlist = []
-        if self.results.multi_hand_landmarks:
-            myHand = self.results.multi_hand_landmarks[handNo]
-            for id, lm in enumerate(myHand.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lmlist.append((id, cx, cy))
-                if draw:
-                    cv2.circle(img, (cx, cy), 7, (255, 255, 130), cv2.FILLED)
-        return lmlist
 
-    def fingersUp(self, lmlist):
-        fingers = []
-        tipIds = [4, 8, 12, 16, 20]
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a whole number of at least 1, got {text!r}")
+    return value
 
-        # Thumb
-        if lmlist[tipIds[0]][1] > lmlist[tipIds[0] - 1][1]:
-            fingers.append(1)
-        else:
-            fingers.append(0)
 
-        # Fingers
-        for id in range(1, 5):
-            if lmlist[tipIds[id]][2] < lmlist[tipIds[id] - 2][2]:
-                fingers.append(1)
-            else:
-                fingers.append(0)
-        return fingers
+def load_resources(warmup, timer, audio, players=1, roi=False, inference_width=None, skip_frames=None, record=None,
+                   classifier=None, capture=None, library=None):
+    # Runs on the warm-up thread while the prompt screens play. mediapipe alone takes about a
+    # second to import, and building the Hands graph and its first inference take longer still.
+    from capture import open_capture
+    from classifier import load_classifier
+    from hand_detector import HandDetector
+    from landmark_log import LandmarkRecorder
+    from scheduler import InferenceScheduler
+    warmup.mark('imports')
 
+    audio.load()
+    warmup.mark('sounds')
 
-def display_random_images(image_dir, images, num_images=8, frame_width=500, frame_height=500):
-    selected_images = random.sample(images, num_images)
+    # Frames are grabbed continuously on their own thread from here on, keeping only the newest
+    cap = open_capture(**(capture or {}))
+    warmup.mark('camera')
 
-    for image_name in selected_images:
-        image_path = os.path.join(image_dir, image_name)
-        image = cv2.imread(image_path)
-
-        if image is None:
-            print(f"Error loading image {image_name}")
-            continue
-
-        resized_image = cv2.resize(image, (frame_width, frame_height))
-
-        # Convert image to RGB
-        image_rgb = cv2.cvtColor(resized_image, cv2.COLOR_BGR2RGB)
-
-        # Convert to Pygame surface
-        image_surface = pygame.surfarray.make_surface(image_rgb)
-
-        # Flip the image surface vertically
-        image_surface = pygame.transform.flip(image_surface, False, True)
-
-        win.fill((255, 255, 255))  # Set the background to white
-        win.blit(image_surface, ((win.get_width() - frame_width) // 2, (win.get_height() - frame_height) // 2))
-        pygame.display.update()
-
-
-        pygame.time.delay(1000)
-
-    return selected_images
-
-def show_countdown(win, countdown_images, beep_sound, delay=1000):
-    for image_name in countdown_images:
-        image_path = os.path.join('.', image_name)
-        image = cv2.imread(image_path)
-
-        if image is None:
-            print(f"Error loading countdown image {image_name}")
-            continue
-
-        resized_image = cv2.resize(image, (500, 500))
-        image_rgb = cv2.cvtColor(resized_image, cv2.COLOR_BGR2RGB)
-        image_surface = pygame.surfarray.make_surface(image_rgb)
-
-        # Flip the image surface vertically
-        image_surface = pygame.transform.flip(image_surface, False, True)
-
-        # Display the countdown image on the white background
-        win.fill((255, 255, 255))
-        win.blit(image_surface, ((win.get_width() - 500) // 2, (win.get_height() - 500) // 2))
-        pygame.display.update()
-
-        # Play the beep sound
-        beep_sound.play()
-
-        # Wait for the specified delay
-        pygame.time.delay(delay)
-
-def gesture_to_image_name(fingers, predefined_gestures):
-    for gesture, pattern in predefined_gestures.items():
-        if fingers == pattern:
-            return gesture
-    return None
-
-def display_text_on_screen(win, text, font_size=64):
-    if not pygame.font.get_init():
-        print("Font system not initialized. Cannot display text.")
-        return
-
-    try:
-        font = pygame.font.Font(None, font_size)
-        text_surface = font.render(text, True, (0, 0, 0))
-        win.fill((255, 255, 255))  # Set the background to white
-        win.blit(text_surface, ((win.get_width() - text_surface.get_width()) // 2,
-                                (win.get_height() - text_surface.get_height()) // 2))
-        pygame.display.update()
-    except pygame.error as e:
-        print(f"Error rendering text: {e}")
-
-# def display_text_on_screen(win, text, font_size=64):
-#     font = pygame.font.Font(None, font_size)
-#     text_surface = font.render(text, True, (0, 0, 0))
-#     win.fill((255, 255, 255))  # Set the background to white
-#     win.blit(text_surface, ((win.get_width() - text_surface.get_width()) // 2,
-#                             (win.get_height() - text_surface.get_height()) // 2))
-#     pygame.display.update()
-
-def main():
-    predefined_gestures = {
-        'Thumbs Up': [1, 0, 0, 0, 0],
-        'Index Up': [0, 1, 0, 0, 0],
-        'Peace': [0, 1, 1, 0, 0],
-        'Rock and Roll': [1, 1, 0, 0, 1],
-        'Fist': [0, 0, 0, 0, 0],
-        'five': [1, 1, 1, 1, 1],
-        'middle_finger': [0, 0, 1, 0, 0],
-        'pinky': [0, 0, 0, 0, 1],
-        'three': [0, 1, 1, 1, 0],
-        'thumb_three': [1, 1, 1, 0, 0],
-        'L': [1, 1, 0, 0, 0],
-        'pinky_three': [0, 0, 1, 1, 1],
-        'four': [0, 1, 1, 1, 1],
-        'middle down three': [0, 1, 0, 1, 1],
-        'call sign': [1, 0, 0, 0, 1],
-        'joint_two': [0, 0, 0, 1, 1],
-    }
+    if classifier == 'references':
+        # Match hands against the embeddings of the gesture images, extracted once and cached
+        from gesture_index import build_index
+        model, index_stats = build_index(library, lambda: HandDetector(mode=True, maxHands=1))
+        warmup.mark('gesture index')
+        if not len(model):
+            print(f"No hands found in the gesture images ({index_stats['no_hand']}); using the finger rules")
+            model = None
+    else:
+        model = load_classifier(classifier) if classifier else None
+    detector = HandDetector(maxHands=max(2, players), roi=roi, inferenceWidth=inference_width, classifier=model,
+                            roiHands=players)
+    detector.warmUp()
+    # The warm-up inference is the first one; marking it here keeps the prompt screens out of it
+    timer.milestone('first_inference')
+    warmup.mark('detector')
+    detector.instrumentation = timer
+    if record:
+        detector.recorder = LandmarkRecorder(record, detector.maxHands)
+    source = InferenceScheduler(detector, every=skip_frames) if skip_frames else detector
+    return {'cap': cap, 'detector': source, 'hand_detector': detector}
+
+
+def main(pipelined=False, record=None, roi=False, inference_width=None, skip_frames=None,
+         legacy_render=False, players=1, stats=True, stats_out=None, overlay=False, profile=False,
+         trace_memory=False, attract=False, vote_window=8, smoothing=None, classifier=None, audio_buffer=None,
+         camera='0', capture_size=(640, 480), capture_fps=30, capture_format=None, telemetry_path=None,
+         cabinet=None, telemetry_max_mb=64, gestures=None):
+    configure_mixer(buffer=audio_buffer or BUFFER)
+    pygame.mixer.init()
+    pygame.init()
+    pygame.font.init()
+
+    # Create a Pygame window
+    win = pygame.display.set_mode((1440, 850))
+    show_splash(win)
+
+    from instrumentation import Instrumentation
+    timer = Instrumentation(enabled=stats or bool(stats_out) or overlay, profile=profile, trace_memory=trace_memory,
+                            origin=STARTED)
+    timer.milestone('splash')
+    from gestures import MANIFEST, load_library
+    library = load_library(gestures or MANIFEST)
+    telemetry = None
+    if telemetry_path:
+        from telemetry import TelemetryWriter
+        telemetry = TelemetryWriter(telemetry_path, cabinet, max_bytes=telemetry_max_mb * 1024 * 1024).start()
+        telemetry.log('session_start', players=players, pipelined=pipelined, classifier=classifier,
+                      attract=attract, camera=camera)
+    # The camera, sounds and hand detector load in the background while the prompts are shown
+    # Cue requests are accepted straight away, but one made before its cue has been decoded is
+    # skipped (and counted) rather than played late
+    audio = AudioEngine(SOUNDS, buffer=audio_buffer or BUFFER).start()
+    capture = {'source': camera, 'size': capture_size, 'fps': capture_fps}
+    if capture_format:
+        capture['formats'] = (capture_format,)
+    warmup = Warmup(lambda w: load_resources(w, timer, audio, players, roi, inference_width, skip_frames, record,
+                                             classifier, capture, library), timer).start()
+
+    from assets import AssetCache
+    from display import FrameRenderer
+    from game import Game
+
+    gesture_table = library.table
 
     image_dir = '.'
-    images = [
-        'fist.png', 'index_up.jpg', 'peace.png', 'three.jpeg', 'thumbs_up.jpeg', 'rock_and_roll.jpeg', 'L.jpeg',
-        'call_me.jpeg', 'pinky.jpg', 'thumb_three.jng', 'joint_two.jpeg', 'five.jpeg', 'four.jpg'
-    ]
-
-    selected_images = display_random_images(image_dir, images)
-
-    image_to_gesture = {
-        'fist.png': 'Fist',
-        'index_up.jpg': 'Index Up',
-        'peace.png': 'Peace',
-        'rock_and_roll.jpeg': 'Rock and Roll',
-        'three.jpeg': 'three',
-        'thumbs_up.jpeg': 'Thumbs Up',
-        'L.jpeg': 'L',
-        'call_me.jpeg': 'call sign',
-        'pinky.jpg': 'pinky',
-        'thumb_three.jng': 'thumb_three',
-        'joint_two.jpeg': 'joint_two',
-        'five.jpeg': 'five',
-        'four.jpg': 'four',
-    }
+    # Prompt images are named relative to the manifest; the countdown images live next to main.py
+    image_to_gesture = {os.path.relpath(os.path.join(library.image_dir, image)): name
+                        for image, name in library.prompts.items()}
+    images = list(image_to_gesture)
 
     countdown_images = ['3.jpg', '2.jpg', '1.jpg']
 
-    # Display countdown before capturing gestures
-    show_countdown(win, countdown_images, beep_sound)
-
-    # Ensure the selected images map to gestures without repetition
-    expected_gestures = [image_to_gesture[img] for img in selected_images]
-    print(f"Expected Gestures: {expected_gestures}")
-
-    # Capture real-time gestures
-    cap = cv2.VideoCapture(0)
-    detector = HandDetector()
-    captured_gestures = []
-    consistent_gesture_start = None
-    consistent_gesture = None
-
-    running = True
-    while running and len(captured_gestures) < len(expected_gestures):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        success, img = cap.read()
-        if not success:
-            break
-
-        img = detector.findHands(img)
-        lmlist = detector.findPosition(img)
-
-        if len(lmlist) != 0:
-            fingers = detector.fingersUp(lmlist)
-            gesture_name = gesture_to_image_name(fingers, predefined_gestures)
-
-
-            if gesture_name and gesture_name in expected_gestures:
-                if consistent_gesture_start is None or gesture_name != consistent_gesture:
-                    consistent_gesture_start = time.time()
-                    consistent_gesture = gesture_name
-                elif time.time() - consistent_gesture_start >= 1:
-                    captured_gestures.append(gesture_name)
-                    # display_text_on_screen(win, f"Gesture: {gesture_name}", font_size=64)
-                    print(f"Gesture: {gesture_name}")
-                    beep_sound.play()
-                    pygame.time.delay(1000)
-                    consistent_gesture_start = None
-                    consistent_gesture = None
-            else:
-                if consistent_gesture_start is None or gesture_name != consistent_gesture:
-                    consistent_gesture_start = time.time()
-                    consistent_gesture = gesture_name
-                elif time.time() - consistent_gesture_start >= 1:
-                    captured_gestures.append("Random")
-                    print("Gesture: Random")
-                    beep_sound.play()
-                    pygame.time.delay(1000)
-                    consistent_gesture_start = None
-                    consistent_gesture = None
-
-
-        # Show real-time camera feed in Pygame window
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        imgSurface = pygame.surfarray.make_surface(imgRGB)
-        imgSurface = pygame.transform.rotate(imgSurface, -90)
-        imgSurface = pygame.transform.flip(imgSurface, True, False)
-        win.fill((255, 255, 255))  # Set the background to white
-        win.blit(imgSurface, ((win.get_width() - imgSurface.get_width()) // 2,
-                              (win.get_height() - imgSurface.get_height()) // 2))
-        pygame.display.update()
-
+    # Decode and convert every prompt and countdown image once, before the timers start
+    assets = AssetCache(image_dir)
+    missing = assets.preload(images + countdown_images)
+    images = [img for img in images if img not in missing]
+
+    renderer = FrameRenderer(win, legacy=legacy_render)
+    game = Game(win, assets, audio, None, None, gesture_table, images, image_to_gesture, countdown_images,
+                renderer, timer, pipelined=pipelined, players=players, overlay=overlay, warmup=warmup,
+                attract=attract, vote_window=vote_window, smoothing=smoothing, telemetry=telemetry)
+    timer.start_profiling()
+    game.run()
+    timer.stop_profiling()
+
+    # Quitting before the warm-up finished still has to wait for it, to release the camera
+    resources = warmup.wait()
+    cap, source, detector = resources['cap'], resources['detector'], resources['hand_detector']
+    if game.pipeline:
+        game.pipeline.stop()
+        timer.report(game.pipeline.dropped)
+    else:
+        timer.report()
+    print(f"Capture: {cap.captureStats()}")
+    print(f"Inference: {detector.inferenceStats()}")
+    print(f"Render: {renderer.renderStats()}")
+    print(f"Audio: {audio.audioStats()}")
+    if attract:
+        recent = [max(counts) for counts in game.scores]
+        if recent:
+            print(f"Session: {game.rounds_played} rounds, mean best score {sum(recent) / len(recent):.1f} "
+                  f"over the last {len(recent)}")
+    if skip_frames:
+        print(f"Scheduler: {source.scheduleStats()}")
+    if stats_out:
+        timer.export(stats_out, inference=detector.inferenceStats(), render=renderer.renderStats())
+    if telemetry:
+        telemetry.log('session_end', rounds=game.rounds_played, capture=cap.captureStats(),
+                      inference=detector.inferenceStats(), audio=audio.audioStats())
+        telemetry.close()
+        print(f"Telemetry: {telemetry.telemetryStats()}")
     cap.release()
+    audio.stop()
+    if detector.recorder:
+        detector.recorder.close()
 
-    correct_count = sum([1 for i in range(len(expected_gestures)) if i < len(captured_gestures) and expected_gestures[i] == captured_gestures[i]])
-
-    if correct_count == 8:
-        display_text_on_screen(win, "You win 3 candies!", 64)
-        cheering_sound.play()
-    elif correct_count >= 5:
-        display_text_on_screen(win, "You win 2 candies!", 64)
-        clapping_sound.play()
-    elif correct_count >= 4:
-        display_text_on_screen(win, "You win 1 candy!", 64)
-        clapping_sound.play()
-    else:
-        display_text_on_screen(win, "Keep practicing!", 64)
-        over_sound.play()
+    pygame.quit()
 
-    pygame.time.delay(5000)
 
-    pygame.quit()
+def build_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pipelined', action='store_true',
+                        help='run camera capture, hand inference and rendering as overlapping stages')
+    parser.add_argument('--record', metavar='PATH',
+                        help='save every frame\'s hand landmarks to a .lmk recording for offline replay')
+    parser.add_argument('--roi', action='store_true',
+                        help='crop inference to the hand tracked last frame, falling back to the full frame')
+    parser.add_argument('--inference-width', type=int, metavar='PIXELS',
+                        help='downscale frames to this width before hand inference')
+    parser.add_argument('--skip-frames', type=int, metavar='N',
+                        help='run hand inference every N frames to start with, reusing the last landmarks in '
+                             'between; the interval grows while inference is too slow for the camera, and motion '
+                             'in the image runs it early')
+    parser.add_argument('--legacy-render', action='store_true',
+                        help='use the old convert/rotate/flip display path, for comparing render times')
+    parser.add_argument('--players', type=positive_int, default=1,
+                        help='number of players sharing the camera, each scored on their own hand')
+    parser.add_argument('--no-stats', action='store_true', help='turn off per-stage timing')
+    parser.add_argument('--stats-out', metavar='PATH', help='write per-stage latency percentiles to a .json or .csv file')
+    parser.add_argument('--overlay', action='store_true', help='show live stage latencies on screen')
+    parser.add_argument('--profile', action='store_true', help='run cProfile over the game and print the top functions')
+    parser.add_argument('--trace-memory', action='store_true', help='trace Python allocations with tracemalloc')
+    parser.add_argument('--attract', action='store_true',
+                        help='keep running rounds, starting each one when a new player holds up a hand')
+    parser.add_argument('--vote-window', type=positive_int, default=8, metavar='FRAMES',
+                        help='number of recent frames voted on before a held gesture counts')
+    parser.add_argument('--smooth', type=float, metavar='SECONDS',
+                        help='time constant for smoothing hand landmarks before classification')
+    parser.add_argument('--classifier', metavar='MODEL',
+                        help='classify hands with a model from train_classifier.py instead of the finger rules, '
+                             'or "references" to match them against the gesture images')
+    parser.add_argument('--gestures', metavar='MANIFEST', help='gesture library to play with (default gestures.json)')
+    parser.add_argument('--audio-buffer', type=int, metavar='SAMPLES',
+                        help=f'mixer buffer size; smaller plays cues sooner but may crackle (default {BUFFER})')
+    parser.add_argument('--camera', default='0', metavar='SOURCE',
+                        help='camera index, a video file played back as a live camera, or "synthetic"')
+    parser.add_argument('--capture-size', type=parse_size, default=(640, 480), metavar='WIDTHxHEIGHT',
+                        help='camera resolution to ask for; the driver picks the nearest it supports')
+    parser.add_argument('--capture-fps', type=int, default=30, help='camera frame rate to ask for')
+    parser.add_argument('--capture-format', choices=CAPTURE_FORMATS,
+                        help='camera pixel format (default: MJPG if the camera offers it, else YUYV)')
+    parser.add_argument('--telemetry', metavar='PATH',
+                        help='log rounds, captures and frame rate to a .jsonl file, or SQLite for .db/.sqlite')
+    parser.add_argument('--cabinet', help='name this machine goes by in telemetry (default: the host name)')
+    parser.add_argument('--telemetry-max-mb', type=int, default=64,
+                        help='size at which the telemetry file is rotated to a timestamped name')
+    return parser
 
 
 if __name__ == "__main__":
-    main()
+    args = build_parser().parse_args()
+    main(pipelined=args.pipelined, record=args.record, roi=args.roi, inference_width=args.inference_width,
+         skip_frames=args.skip_frames, legacy_render=args.legacy_render,
+         players=args.players, stats=not args.no_stats, stats_out=args.stats_out, overlay=args.overlay,
+         profile=args.profile, trace_memory=args.trace_memory, attract=args.attract,
+         vote_window=args.vote_window, smoothing=args.smooth, classifier=args.classifier,
+         audio_buffer=args.audio_buffer, camera=args.camera, capture_size=args.capture_size,
+         capture_fps=args.capture_fps, capture_format=args.capture_format, telemetry_path=args.telemetry,
+         cabinet=args.cabinet, telemetry_max_mb=args.telemetry_max_mb, gestures=args.gestures)
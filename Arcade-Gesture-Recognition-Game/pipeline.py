@@ -0,0 +1,117 @@
+import threading
+import time
+
+from instrumentation import Instrumentation
+
+
+class LatestFrameQueue:
+    # Bounded queue where a new item replaces the oldest one instead of blocking
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.items = []
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) >= self.maxsize:
+                self.items.pop(0)
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.pop(0)
+
+    def clear(self):
+        with self.cond:
+            self.items.clear()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class GesturePipeline:
+    # Camera grab thread -> inference worker -> render stage (caller's thread).
+    # Queues hold only the newest item so each stage works on the freshest frame. pause() idles the
+    # inference stage while the capture thread keeps the camera drained; frames read while paused
+    # are discarded without counting as dropped, so the drop counts only cover screens that use them.
+    def __init__(self, cap, process, timer=None):
+        self.cap = cap
+        self.process = process
+        self.timer = timer or Instrumentation()
+        self.frames = LatestFrameQueue()
+        self.results = LatestFrameQueue()
+        self.stop_event = threading.Event()
+        self.running = threading.Event()
+        self.running.set()
+        self.threads = []
+
+    def start(self):
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='inference', daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            success, img = self.cap.read()
+            if not success:
+                break
+            self.timer.record('capture', time.perf_counter() - start)
+            if self.running.is_set():
+                self.frames.put(img)
+        self.frames.close()
+
+    def _inference_loop(self):
+        while not self.stop_event.is_set():
+            if not self.running.wait(timeout=0.1):
+                continue
+            img = self.frames.get(timeout=0.1)
+            if img is None:
+                if self.frames.closed:
+                    break
+                continue
+            start = time.perf_counter()
+            result = self.process(img)
+            self.timer.record('inference', time.perf_counter() - start)
+            self.results.put(result)
+        self.results.close()
+
+    def get(self, timeout=0.1):
+        return self.results.get(timeout)
+
+    def pause(self):
+        self.running.clear()
+
+    def resume(self):
+        if not self.running.is_set():
+            # A frame or result from before the pause is stale by now
+            self.frames.clear()
+            self.results.clear()
+            self.running.set()
+
+    @property
+    def alive(self):
+        return not self.results.closed
+
+    @property
+    def dropped(self):
+        return {'capture': self.frames.dropped, 'inference': self.results.dropped}
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=1)
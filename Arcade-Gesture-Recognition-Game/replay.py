@@ -0,0 +1,196 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import cv2
+
+from gestures import MANIFEST, ConsistencyTracker, encode_fingers, load_library
+from classifier import load_classifier
+from hand_detector import HandDetector, fingers_up
+from landmark_log import HANDEDNESS_LABELS, LandmarkRecorder, open_recording, pixel_landmarks
+from scheduler import InferenceScheduler
+from stabilizer import GestureStabilizer, LandmarkFilter
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def video_frames(path):
+    # Frame timestamps come from the container, falling back to the nominal frame rate
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    try:
+        while True:
+            success, img = cap.read()
+            if not success:
+                break
+            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if timestamp <= 0 and index > 0:
+                timestamp = index / fps
+            yield timestamp, img
+            index += 1
+    finally:
+        cap.release()
+
+
+def image_sequence_frames(paths, fps=30.0):
+    for index, path in enumerate(paths):
+        img = cv2.imread(path)
+        if img is None:
+            print(f"Error loading image {path}")
+            continue
+        yield index / fps, img
+
+
+def open_source(source, fps=30.0):
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, '*')) if p.lower().endswith(IMAGE_EXTENSIONS))
+        return image_sequence_frames(paths, fps)
+    if any(ch in source for ch in '*?['):
+        return image_sequence_frames(sorted(glob.glob(source)), fps)
+    return video_frames(source)
+
+
+def detect(frames, detector, gesture_table, landmark_filter=None):
+    for timestamp, img in frames:
+        landmarks = detector.detect(img, draw=False, timestamp=timestamp)
+        if landmark_filter:
+            landmarks = landmark_filter.update(landmarks[:1], timestamp)
+        gesture_name = None
+        if len(landmarks) != 0 and detector.classifier:
+            gesture_name = detector.classifier.predict(landmarks[:1], detector.handedness[:1] or None)[0]
+        elif len(landmarks) != 0:
+            fingers = fingers_up(landmarks[:1])[0]
+            gesture_name = gesture_table.lookup_code(int(encode_fingers(fingers)))
+        yield timestamp, len(landmarks) != 0, gesture_name
+
+
+def recorded(path, gesture_table, landmark_filter=None, classifier=None):
+    # Classifies a whole landmark recording in one pass over the memory-mapped records
+    header, records = open_recording(path)
+    first_hand = pixel_landmarks(header, records)[:, 0]
+    if landmark_filter:
+        # The filter is recursive, so this part runs frame by frame
+        for i, (timestamp, hands) in enumerate(zip(records['timestamp'].tolist(), records['hands'].tolist())):
+            if hands:
+                first_hand[i] = landmark_filter.update(first_hand[i:i + 1], timestamp)[0]
+            else:
+                landmark_filter.reset()
+    if classifier:
+        handedness = [HANDEDNESS_LABELS.get(code) for code in records['handedness'][:, 0].tolist()]
+        names = classifier.predict(first_hand, handedness)
+    else:
+        names = gesture_table.lookup_codes(encode_fingers(fingers_up(first_hand)))
+    hand_found = records['hands'] > 0
+    for timestamp, found, name in zip(records['timestamp'].tolist(), hand_found.tolist(), names):
+        yield timestamp, found, name if found else None
+
+
+def replay(observations, gesture_names, expected_gestures=None, hold_time=1.0, cooldown=1.0, window=8, enter=0.6,
+           exit=0.4):
+    # Runs the game's capture logic on a simulated clock taken from frame timestamps.
+    # observations yields (timestamp, hand_found, gesture_name) per frame.
+    # window=0 uses the old unbroken hold timer instead of the voting stabiliser, for comparison.
+    if window:
+        tracker = GestureStabilizer(expected_gestures or gesture_names, hold_time, cooldown, window, enter, exit)
+    else:
+        tracker = ConsistencyTracker(expected_gestures or gesture_names, hold_time, cooldown)
+    captured_gestures = []
+    captures = []
+    frame_count = 0
+    hand_frames = 0
+
+    start = time.perf_counter()
+    for timestamp, hand_found, gesture_name in observations:
+        frame_count += 1
+        hand_frames += bool(hand_found)
+        event = tracker.update(hand_found, gesture_name, timestamp)
+        if event:
+            capture = {'gesture': event.gesture if window else event, 'time': round(timestamp, 3)}
+            if window:
+                capture['latency'] = round(event.latency, 3)
+            captured_gestures.append(capture['gesture'])
+            captures.append(capture)
+            if expected_gestures and len(captured_gestures) >= len(expected_gestures):
+                break
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'captured': captured_gestures,
+        'captures': captures,
+        'frames': frame_count,
+        'hand_frames': hand_frames,
+        'seconds': round(elapsed, 3),
+        'fps': round(frame_count / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    if window and captures:
+        result['mean_latency'] = round(sum(capture['latency'] for capture in captures) / len(captures), 3)
+    if expected_gestures:
+        result['expected'] = list(expected_gestures)
+        result['correct'] = sum(1 for expected, captured in zip(expected_gestures, captured_gestures)
+                                if expected == captured)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded video or image sequences through the '
+                                                 'gesture recognizer as fast as possible, without a display.')
+    parser.add_argument('sources', nargs='+',
+                        help='video files, image directories, image globs or .lmk landmark recordings')
+    parser.add_argument('--expected', help='comma-separated gesture names to score against')
+    parser.add_argument('--fps', type=float, default=30.0, help='frame rate assumed for image sequences')
+    parser.add_argument('--hold', type=float, default=1.0, help='seconds a gesture must be held')
+    parser.add_argument('--cooldown', type=float, default=1.0, help='seconds ignored after each capture')
+    parser.add_argument('--vote-window', type=int, default=8, metavar='FRAMES',
+                        help='recent frames voted on before a held gesture counts; 0 for the old hold timer')
+    parser.add_argument('--enter', type=float, default=0.6, help='share of votes that makes a gesture the candidate')
+    parser.add_argument('--exit', type=float, default=0.4, help='share of votes below which the candidate is dropped')
+    parser.add_argument('--smooth', type=float, metavar='SECONDS', help='time constant for smoothing landmarks')
+    parser.add_argument('--classifier', metavar='MODEL', help='model from train_classifier.py to classify hands with')
+    parser.add_argument('--gestures', metavar='MANIFEST', default=MANIFEST, help='gesture library to classify with')
+    parser.add_argument('--static', action='store_true', help='run MediaPipe in static image mode')
+    parser.add_argument('--roi', action='store_true', help='crop inference to the tracked hand')
+    parser.add_argument('--inference-width', type=int, metavar='PIXELS', help='downscale frames before inference')
+    parser.add_argument('--skip-frames', type=int, metavar='N',
+                        help='run inference every N frames to start with; slow inference lengthens the interval '
+                             'and motion runs it early')
+    parser.add_argument('--record', metavar='DIR', help='save a .lmk landmark recording of each video source')
+    args = parser.parse_args()
+
+    expected_gestures = args.expected.split(',') if args.expected else None
+    gesture_table = load_library(args.gestures).table
+    gesture_names = list(gesture_table.names.values())
+    classifier = load_classifier(args.classifier) if args.classifier else None
+    for source in args.sources:
+        recorder = None
+        if source.endswith('.lmk'):
+            observations = recorded(source, gesture_table, LandmarkFilter(args.smooth) if args.smooth else None,
+                                    classifier)
+        else:
+            # A fresh detector per source so MediaPipe tracking state doesn't leak between recordings
+            detector = HandDetector(mode=args.static, roi=args.roi, inferenceWidth=args.inference_width,
+                                    classifier=classifier)
+            if args.record:
+                name = os.path.splitext(os.path.basename(source.rstrip('/\\*')))[0] or 'frames'
+                recorder = detector.recorder = LandmarkRecorder(os.path.join(args.record, name + '.lmk'),
+                                                                detector.maxHands)
+            scheduler = InferenceScheduler(detector, every=args.skip_frames) if args.skip_frames else None
+            observations = detect(open_source(source, args.fps), scheduler or detector, gesture_table,
+                                  LandmarkFilter(args.smooth) if args.smooth else None)
+
+        result = replay(observations, gesture_names, expected_gestures, args.hold, args.cooldown, args.vote_window,
+                        args.enter, args.exit)
+        result['source'] = source
+        if not source.endswith('.lmk'):
+            result['inference'] = detector.inferenceStats()
+            if scheduler:
+                result['scheduler'] = scheduler.scheduleStats()
+        if recorder:
+            recorder.close()
+        print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import math
+import time
+
+import cv2
+import numpy as np
+
+from hand_detector import draw_points
+
+
+class InferenceScheduler:
+    # Runs full hand inference every `every` frames, or sooner when the frame changes, and reuses
+    # the last landmarks in between. `every` grows with measured inference latency so the loop
+    # keeps up with target_fps. Same detect() interface as HandDetector.
+    def __init__(self, detector, every=3, max_every=10, motion_threshold=6.0, target_fps=30.0,
+                 predict='hold', thumb_size=(64, 48)):
+        self.detector = detector
+        self.min_every = every
+        self.every = every
+        self.max_every = max_every
+        self.motion_threshold = motion_threshold
+        self.target_fps = target_fps
+        self.predict = predict
+        self.thumb_size = thumb_size
+
+        self.thumb = None
+        self.landmarks = None
+        self.handedness = []
+        self.velocity = None
+        self.since_inference = 0
+        self.latency = None
+        self.stats = {'frames': 0, 'inferences': 0, 'motion_triggers': 0}
+
+    def motion(self, img):
+        thumb = cv2.cvtColor(cv2.resize(img, self.thumb_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        score = 0.0 if self.thumb is None else float(cv2.absdiff(thumb, self.thumb).mean())
+        return thumb, score
+
+    def detect(self, img, draw=True, timestamp=None, imgRGB=None):
+        self.stats['frames'] += 1
+        thumb, score = self.motion(img)
+        moved = score > self.motion_threshold
+        if self.landmarks is None or self.since_inference + 1 >= self.every or moved:
+            self.stats['motion_triggers'] += moved and self.since_inference + 1 < self.every
+            return self._infer(img, thumb, draw, timestamp, imgRGB)
+
+        self.since_inference += 1
+        landmarks = self.landmarks
+        if self.predict == 'linear' and self.velocity is not None:
+            landmarks = landmarks + self.velocity * self.since_inference
+        if draw:
+            draw_points(img if imgRGB is None else imgRGB, landmarks, rgb=imgRGB is not None)
+        return landmarks
+
+    def _infer(self, img, thumb, draw, timestamp, imgRGB):
+        start = time.perf_counter()
+        landmarks = self.detector.detect(img, draw, timestamp, imgRGB)
+        latency = time.perf_counter() - start
+
+        # Per-frame velocity for linear prediction, only while the same hands stay in view
+        gap = self.since_inference + 1
+        if self.landmarks is not None and landmarks.shape == self.landmarks.shape:
+            self.velocity = (landmarks - self.landmarks) / gap
+        else:
+            self.velocity = None
+
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.every = int(np.clip(math.ceil(self.latency * self.target_fps), self.min_every, self.max_every))
+        self.landmarks = landmarks
+        self.handedness = list(self.detector.handedness)
+        self.thumb = thumb
+        self.since_inference = 0
+        self.stats['inferences'] += 1
+        return landmarks
+
+    @property
+    def classifier(self):
+        return self.detector.classifier
+
+    def scheduleStats(self):
+        frames = self.stats['frames'] or 1
+        return {
+            'frames': self.stats['frames'],
+            'inferences': self.stats['inferences'],
+            'inference_ratio': self.stats['inferences'] / frames,
+            'motion_triggers': self.stats['motion_triggers'],
+            'every': self.every,
+            'mean_inference_ms': 1000 * (self.latency or 0.0),
+        }
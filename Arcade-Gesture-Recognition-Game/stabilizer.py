@@ -0,0 +1,107 @@
+import collections
+import math
+
+import numpy as np
+
+RANDOM = "Random"
+
+# gesture: captured name; timestamp: when it was captured; latency: seconds from the gesture's
+# first vote in the window to the capture; frames: frames seen over that time
+CaptureEvent = collections.namedtuple('CaptureEvent', ['gesture', 'timestamp', 'latency', 'frames'])
+
+
+class GestureStabilizer:
+    # Debounced replacement for ConsistencyTracker's unbroken hold timer. The last `window`
+    # classifications sit in a ring buffer and are voted on: a gesture becomes the candidate once it
+    # has `enter` of the window's votes and stays the candidate until its share drops below `exit`,
+    # so one flickered frame costs one vote instead of restarting the hold. The candidate is
+    # captured once hold_time has passed since its earliest vote in the window. Hand poses that
+    # aren't expected all vote for "Random"; frames without a hand vote for nothing. Time only comes
+    # from the caller's timestamps, so replays give the same captures every run.
+    def __init__(self, expected_gestures, hold_time=1.0, cooldown=0.0, window=8, enter=0.6, exit=0.4):
+        if window < 1:
+            raise ValueError(f"window must be at least one frame, got {window}")
+        if not 0 < exit <= enter <= 1:
+            raise ValueError(f"need 0 < exit <= enter <= 1, got exit={exit}, enter={enter}")
+        self.expected_gestures = set(expected_gestures)
+        self.hold_time = hold_time
+        self.cooldown = cooldown
+        self.window = window
+        self.enter_votes = math.ceil(enter * window)
+        self.exit_votes = math.ceil(exit * window)
+        self.labels = [None] * window
+        self.times = [0.0] * window
+        self.frame_numbers = [0] * window
+        self.frame = 0
+        self.resume_at = None
+        self.reset()
+
+    def reset(self):
+        self.labels[:] = [None] * self.window
+        self.index = 0
+        self.votes = collections.Counter()
+        self.candidate = None
+        self.candidate_since = None
+        self.candidate_frame = None
+
+    def update(self, hand_found, gesture_name, now):
+        # One frame's classification -> CaptureEvent when a gesture is captured, otherwise None
+        self.frame += 1
+        if self.resume_at is not None and now < self.resume_at:
+            return None
+
+        label = None
+        if hand_found:
+            label = gesture_name if gesture_name in self.expected_gestures else RANDOM
+        old = self.labels[self.index]
+        if old is not None:
+            self.votes[old] -= 1
+        self.labels[self.index] = label
+        self.times[self.index] = now
+        self.frame_numbers[self.index] = self.frame
+        self.index = (self.index + 1) % self.window
+        if label is not None:
+            self.votes[label] += 1
+
+        if self.candidate is not None and self.votes[self.candidate] < self.exit_votes:
+            self.candidate = None
+        if self.candidate is None:
+            leader, votes = max(self.votes.items(), key=lambda item: item[1], default=(None, 0))
+            if votes < self.enter_votes:
+                return None
+            first = min((i for i, label in enumerate(self.labels) if label == leader), key=self.times.__getitem__)
+            self.candidate = leader
+            self.candidate_since = self.times[first]
+            self.candidate_frame = self.frame_numbers[first]
+
+        if now - self.candidate_since < self.hold_time:
+            return None
+        event = CaptureEvent(self.candidate, now, now - self.candidate_since, self.frame - self.candidate_frame + 1)
+        self.reset()
+        self.resume_at = now + self.cooldown
+        return event
+
+
+class LandmarkFilter:
+    # Exponential moving average over landmark positions. The smoothing is set by a time constant
+    # in seconds rather than a per-frame factor, so it behaves the same at 10 and 60 fps. It
+    # restarts whenever the number of hands changes.
+    def __init__(self, tau=0.1):
+        self.tau = tau
+        self.reset()
+
+    def reset(self):
+        self.state = None
+        self.last = None
+
+    def update(self, landmarks, now):
+        if not len(landmarks):
+            self.reset()
+            return landmarks
+        if self.state is None or self.state.shape != landmarks.shape:
+            self.state = np.array(landmarks, dtype=np.float32)
+        else:
+            alpha = 1.0 - math.exp(-max(now - self.last, 0.0) / self.tau)
+            self.state += alpha * (landmarks - self.state)
+        self.last = now
+        return self.state
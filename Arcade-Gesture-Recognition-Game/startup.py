@@ -0,0 +1,52 @@
+import threading
+
+import pygame
+
+
+def show_splash(win, text="Loading..."):
+    # Needs nothing but pygame, so it can be drawn before the slow imports and loading start
+    font = pygame.font.Font(None, 64)
+    win.fill((255, 255, 255))  # Set the background to white
+    text_surface = font.render(text, True, (0, 0, 0))
+    win.blit(text_surface, text_surface.get_rect(center=win.get_rect().center))
+    pygame.display.update()
+
+
+class Warmup:
+    # Runs slow startup work (module imports, sound decoding, opening the camera, building and
+    # warming up the MediaPipe graph) on a background thread while the prompt screens play.
+    # load(warmup) returns whatever the game needs; an exception it raises is re-raised by wait().
+    def __init__(self, load, timer=None):
+        self.load = load
+        self.timer = timer
+        self.result = None
+        self.error = None
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self.load(self)
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.mark('ready')
+            self.finished.set()
+
+    def mark(self, name):
+        if self.timer:
+            self.timer.milestone(name)
+
+    def done(self):
+        return self.finished.is_set()
+
+    def wait(self, timeout=None):
+        if not self.finished.wait(timeout):
+            return None
+        if self.error:
+            raise self.error
+        return self.result
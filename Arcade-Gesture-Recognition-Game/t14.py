@@ -5,12 +5,15 @@ import time
 import mediapipe as mp
 import pygame
 
+# A small mixer buffer so the beep isn't heard ~90 ms after the screen it belongs to
+pygame.mixer.pre_init(44100, -16, 2, 512)
 pygame.mixer.init()
 pygame.init()
 
 # Create a Pygame window
 win = pygame.display.set_mode((1440, 850))
-pygame.mixer.music.load("beep_sound.mp3")
+# Decoded once here instead of reloaded from disk for every beep
+beep = pygame.mixer.Sound("beep_sound.mp3")
 
 
 class HandDetector:
@@ -118,8 +121,7 @@ def show_countdown(win, countdown_images, beep_sound, delay=1000):
         pygame.display.update()
 
         # Play the beep sound
-        pygame.mixer.music.load(beep_sound)
-        pygame.mixer.music.play()
+        beep_sound.play()
 
         # Wait for the specified delay
         pygame.time.delay(delay)
@@ -183,7 +185,7 @@ def main():
     }
 
     countdown_images = ['3.jpg', '2.jpg', '1.jpg']
-    beep_sound = "beep_sound.mp3"
+    beep_sound = beep
 
     # Display countdown before capturing gestures
     show_countdown(win, countdown_images, beep_sound)
@@ -226,7 +228,7 @@ def main():
                     if elapsed_time >= 1.0:  # 1 second consistency check
                         captured_gestures.append(gesture_name)
                         print(f"Captured Gesture: {gesture_name}")
-                        pygame.mixer.music.play()
+                        beep.play()
                         consistent_gesture_start = None
                         consistent_gesture = None
 
@@ -0,0 +1,276 @@
+import bisect
+import glob
+import json
+import math
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+# Reaction and hold times from 10 ms to 2 minutes in ~5% steps; FPS in whole frames
+LATENCY_EDGES = [0.01 * 1.05 ** i for i in range(int(math.log(12000) / math.log(1.05)) + 2)]
+FPS_EDGES = list(range(0, 241))
+
+
+def _plain(value):
+    # numpy scalars and anything else json can't take
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def rotated_path(path):
+    # telemetry.jsonl -> telemetry-20240131-235959.jsonl, so a glob over the stem finds every file
+    stem, ext = os.path.splitext(path)
+    candidate = f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+    n = 1
+    while os.path.exists(candidate):
+        candidate = f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}-{n}{ext}"
+        n += 1
+    return candidate
+
+
+class JsonLinesSink:
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, records):
+        self.file.write(''.join(json.dumps(record, separators=(',', ':'), default=_plain) + '\n'
+                                for record in records))
+        self.file.flush()
+
+    def size(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class SQLiteSink:
+    # One row per event; the fields that are not common to every event go in a JSON column
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('CREATE TABLE IF NOT EXISTS events '
+                        '(t REAL, cabinet TEXT, session TEXT, event TEXT, data TEXT)')
+
+    def write(self, records):
+        with self.db:
+            self.db.executemany('INSERT INTO events VALUES (?, ?, ?, ?, ?)', [
+                (record['t'], record['cabinet'], record['session'], record['event'],
+                 json.dumps({k: v for k, v in record.items() if k not in ('t', 'cabinet', 'session', 'event')},
+                            separators=(',', ':'), default=_plain))
+                for record in records])
+
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def close(self):
+        self.db.close()
+
+
+class TelemetryWriter:
+    # Append-only gameplay event log. log() only stamps the event and puts it on a bounded queue,
+    # so it never blocks the game loop; if the disk falls so far behind that the queue fills, new
+    # events are dropped and counted instead. A background thread writes them in batches (whatever
+    # arrived within flush_interval, at most `batch` at a time) to JSON Lines, or SQLite for a
+    # .db/.sqlite path, and rotates the file to a timestamped name once it reaches max_bytes.
+    # Every event carries the wall-clock time, the cabinet name and a per-run session id.
+    def __init__(self, path, cabinet=None, max_bytes=64 * 1024 * 1024, batch=256, flush_interval=1.0,
+                 queue_size=10000):
+        self.path = path
+        self.cabinet = cabinet or socket.gethostname()
+        self.session = uuid.uuid4().hex[:12]
+        self.max_bytes = max_bytes
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(queue_size)
+        self.stats = {'logged': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'rotations': 0}
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self.thread.start()
+        return self
+
+    def log(self, event, **fields):
+        record = {'t': time.time(), 'cabinet': self.cabinet, 'session': self.session, 'event': event}
+        record.update(fields)
+        try:
+            self.queue.put_nowait(record)
+            self.stats['logged'] += 1
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    def close(self):
+        if self.thread:
+            try:
+                self.queue.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self.thread.join(timeout=5.0)
+            self.thread = None
+
+    def _open(self):
+        if self.path.lower().endswith(SQLITE_EXTENSIONS):
+            return SQLiteSink(self.path)
+        return JsonLinesSink(self.path)
+
+    def _run(self):
+        # The sink is opened here since SQLite connections belong to the thread that made them
+        sink = self._open()
+        try:
+            done = False
+            while not done:
+                records = [self.queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(records) < self.batch:
+                    try:
+                        records.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+                if None in records:
+                    done = True
+                    records = [record for record in records if record is not None]
+                if records:
+                    sink.write(records)
+                    self.stats['written'] += len(records)
+                    self.stats['batches'] += 1
+                if sink.size() >= self.max_bytes:
+                    sink.close()
+                    os.replace(self.path, rotated_path(self.path))
+                    self.stats['rotations'] += 1
+                    sink = self._open()
+        finally:
+            sink.close()
+
+    def telemetryStats(self):
+        return dict(self.stats, queued=self.queue.qsize())
+
+
+def log_paths(sources):
+    # Files, globs and directories -> log files, oldest first by modification time
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                paths += [os.path.join(root, name) for name in files
+                          if name.endswith('.jsonl') or name.lower().endswith(SQLITE_EXTENSIONS)]
+        elif any(ch in source for ch in '*?['):
+            paths += glob.glob(source, recursive=True)
+        else:
+            paths.append(source)
+    return sorted(set(paths), key=os.path.getmtime)
+
+
+def read_events(paths):
+    # Streams events out of JSON Lines and SQLite logs one at a time; a line cut short by a
+    # crash mid-write is skipped
+    for path in paths:
+        if path.lower().endswith(SQLITE_EXTENSIONS):
+            db = sqlite3.connect(path)
+            try:
+                for t, cabinet, session, event, data in db.execute(
+                        'SELECT t, cabinet, session, event, data FROM events ORDER BY rowid'):
+                    record = json.loads(data)
+                    record.update(t=t, cabinet=cabinet, session=session, event=event)
+                    yield record
+            finally:
+                db.close()
+            continue
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class Histogram:
+    # Counts per fixed bin, so any number of samples takes the same memory; percentiles are
+    # accurate to a bin (about 5% with LATENCY_EDGES)
+    def __init__(self, edges):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q / 100 * (self.count - 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                # Middle of the bin; values beyond the outer edges are reported as the edge
+                if index == 0 or index == len(self.edges):
+                    return self.edges[min(index, len(self.edges) - 1)]
+                return (self.edges[index - 1] + self.edges[index]) / 2
+        return self.edges[-1]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class GestureTally:
+    def __init__(self):
+        self.prompts = 0
+        self.correct = 0
+        self.random = 0
+        self.reaction = Histogram(LATENCY_EDGES)
+        self.hold = Histogram(LATENCY_EDGES)
+
+
+class CabinetTally:
+    def __init__(self):
+        self.sessions = 0
+        self.rounds = 0
+        self.candies = 0
+        self.fps = Histogram(FPS_EDGES)
+        self.gestures = {}
+        self.first = None
+        self.last = None
+
+
+def aggregate(events, since=None, until=None):
+    # One pass over the events -> {cabinet: CabinetTally}. Memory grows with the number of
+    # cabinets and gestures, not with the number of events.
+    cabinets = {}
+    for record in events:
+        t = record.get('t', 0)
+        if (since and t < since) or (until and t >= until):
+            continue
+        cabinet = cabinets.get(record.get('cabinet'))
+        if cabinet is None:
+            cabinet = cabinets[record.get('cabinet')] = CabinetTally()
+        cabinet.first = t if cabinet.first is None else min(cabinet.first, t)
+        cabinet.last = t if cabinet.last is None else max(cabinet.last, t)
+        event = record.get('event')
+        if event == 'session_start':
+            cabinet.sessions += 1
+        elif event == 'capture':
+            gesture = cabinet.gestures.get(record['expected'])
+            if gesture is None:
+                gesture = cabinet.gestures[record['expected']] = GestureTally()
+            gesture.prompts += 1
+            gesture.correct += bool(record.get('correct'))
+            gesture.random += record.get('captured') == 'Random'
+            if record.get('reaction') is not None:
+                gesture.reaction.add(record['reaction'])
+            if record.get('hold') is not None:
+                gesture.hold.add(record['hold'])
+        elif event == 'round_end':
+            cabinet.rounds += 1
+            cabinet.candies += sum(record.get('candies', ()))
+        elif event == 'fps':
+            cabinet.fps.add(record['fps'])
+    return cabinets
@@ -0,0 +1,82 @@
+import argparse
+import datetime
+import json
+import sys
+
+from telemetry import aggregate, log_paths, read_events
+
+
+def timestamp(text):
+    return datetime.datetime.fromisoformat(text).timestamp()
+
+
+def ms(seconds):
+    return '-' if seconds is None else f"{1000 * seconds:.0f}"
+
+
+def summary(cabinets):
+    # {cabinet: CabinetTally} -> plain dict for --json
+    return {
+        name: {
+            'sessions': cabinet.sessions,
+            'rounds': cabinet.rounds,
+            'candies': cabinet.candies,
+            'first': cabinet.first,
+            'last': cabinet.last,
+            'fps': {'p5': cabinet.fps.percentile(5), 'p50': cabinet.fps.percentile(50), 'samples': cabinet.fps.count},
+            'gestures': {
+                gesture: {
+                    'prompts': tally.prompts,
+                    'success_rate': tally.correct / tally.prompts,
+                    'random_rate': tally.random / tally.prompts,
+                    'reaction_s': {f"p{q}": tally.reaction.percentile(q) for q in (50, 90, 99)},
+                    'hold_s': {f"p{q}": tally.hold.percentile(q) for q in (50, 90, 99)},
+                }
+                for gesture, tally in sorted(cabinet.gestures.items())
+            },
+        }
+        for name, cabinet in sorted(cabinets.items(), key=lambda item: str(item[0]))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-cabinet gesture success rates and reaction times from '
+                                                 'telemetry logs, streamed in constant memory')
+    parser.add_argument('sources', nargs='*', default=['telemetry*.jsonl', 'telemetry*.db'],
+                        help='.jsonl or SQLite logs, globs or directories (rotated files included)')
+    parser.add_argument('--since', type=timestamp, metavar='DATE', help='only events from this ISO date/time on')
+    parser.add_argument('--until', type=timestamp, metavar='DATE', help='only events before this ISO date/time')
+    parser.add_argument('--cabinet', action='append', help='only these cabinets (repeatable)')
+    parser.add_argument('--json', metavar='PATH', help='also write the summary as JSON')
+    args = parser.parse_args()
+
+    paths = log_paths(args.sources)
+    if not paths:
+        sys.exit("No telemetry logs found")
+    events = read_events(paths)
+    if args.cabinet:
+        events = (record for record in events if record.get('cabinet') in args.cabinet)
+    cabinets = aggregate(events, args.since, args.until)
+
+    for name, cabinet in summary(cabinets).items():
+        first = datetime.datetime.fromtimestamp(cabinet['first']).strftime('%Y-%m-%d')
+        last = datetime.datetime.fromtimestamp(cabinet['last']).strftime('%Y-%m-%d')
+        fps = cabinet['fps']
+        print(f"{name}: {cabinet['sessions']} sessions, {cabinet['rounds']} rounds, {cabinet['candies']} candies "
+              f"({first} to {last}); fps p50 {fps['p50'] if fps['samples'] else '-'}, "
+              f"p5 {fps['p5'] if fps['samples'] else '-'}")
+        print(f"  {'gesture':<20} {'prompts':>7} {'success':>7} {'random':>6} "
+              f"{'reaction p50':>12} {'p90':>6} {'p99 ms':>6} {'hold p50 ms':>11}")
+        for gesture, tally in cabinet['gestures'].items():
+            reaction = tally['reaction_s']
+            print(f"  {gesture:<20} {tally['prompts']:>7} {tally['success_rate']:>7.1%} {tally['random_rate']:>6.1%} "
+                  f"{ms(reaction['p50']):>12} {ms(reaction['p90']):>6} {ms(reaction['p99']):>6} "
+                  f"{ms(tally['hold_s']['p50']):>11}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary(cabinets), f, indent=2)
+        print(f"Summary written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import os
+import sys
+
+# Headless: SDL's dummy drivers stand in for the window and sound card
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+import pytest  # noqa: E402
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [GAME_DIR, os.path.join(GAME_DIR, 'benchmarks')]
+
+from assets import AssetCache  # noqa: E402
+from display import FrameRenderer  # noqa: E402
+from game import CAPTURE, Game  # noqa: E402
+from gestures import IMAGE_TO_GESTURE, PREDEFINED_GESTURES, GestureTable  # noqa: E402
+from instrumentation import Instrumentation  # noqa: E402
+from synthetic_hands import make_hand  # noqa: E402
+
+COUNTDOWN_IMAGES = ['3.jpg', '2.jpg', '1.jpg']
+FPS = 30.0
+
+
+class Camera:
+    def __init__(self):
+        self.frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+
+    def read(self, img=None):
+        return True, self.frame.copy() if img is None else img
+
+    def grab(self):
+        return True
+
+
+class Player:
+    # Makes each expected gesture in turn during capture
+    def __init__(self, game):
+        self.game = game
+        scale = np.array([640, 480, 1], dtype=np.float32)
+        self.hands = {name: make_hand(pattern)[None] * scale for name, pattern in PREDEFINED_GESTURES.items()}
+        self.handedness = ['Left']
+        self.classifier = None
+
+    def detect(self, img, draw=True, timestamp=None, imgRGB=None):
+        game = self.game
+        if game.state == CAPTURE and len(game.captured_gestures) < len(game.expected_gestures):
+            return self.hands[game.expected_gestures[len(game.captured_gestures)]]
+        return np.zeros((0, 21, 3), dtype=np.float32)
+
+
+class Clock:
+    # Each reading is one camera frame later
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1 / FPS
+        return self.now
+
+
+class Silent:
+    def play(self, name):
+        pass
+
+
+class EventLog:
+    def __init__(self):
+        self.events = []
+
+    def log(self, event, **fields):
+        self.events.append(dict(fields, event=event))
+
+
+@pytest.fixture
+def window():
+    cwd = os.getcwd()
+    os.chdir(GAME_DIR)
+    pygame.init()
+    yield pygame.display.set_mode((1440, 850))
+    pygame.quit()
+    os.chdir(cwd)
+
+
+def test_fps_is_only_sampled_on_screens_that_read_frames(window):
+    telemetry = EventLog()
+    timer = Instrumentation()
+    images = list(IMAGE_TO_GESTURE)
+    game = Game(window, AssetCache('.'), Silent(), Camera(), None, GestureTable(PREDEFINED_GESTURES), images,
+                IMAGE_TO_GESTURE, COUNTDOWN_IMAGES, FrameRenderer(window), timer, num_images=3, prompt_time=0.5,
+                countdown_time=0.5, capture_pause=0.5, result_time=3.0, max_fps=0, clock=Clock(),
+                telemetry=telemetry)
+    game.detector = Player(game)
+    game.run()
+
+    samples = [event for event in telemetry.events if event['event'] == 'fps']
+    assert samples
+    assert {event['state'] for event in samples} == {CAPTURE}
+    assert all(event['fps'] == pytest.approx(FPS, rel=0.1) for event in samples)
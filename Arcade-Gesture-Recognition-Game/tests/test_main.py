@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import capture  # noqa: E402
+from main import CAPTURE_FORMATS, build_parser  # noqa: E402
+
+
+@pytest.mark.parametrize('players', ['0', '-1'])
+def test_players_must_be_positive(players):
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['--players', players])
+
+
+def test_players():
+    assert build_parser().parse_args([]).players == 1
+    assert build_parser().parse_args(['--players', '2']).players == 2
+
+
+def test_capture_formats_match_capture():
+    assert CAPTURE_FORMATS == capture.FORMATS
@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pipeline import GesturePipeline  # noqa: E402
+
+
+class ListCamera:
+    # Hands out the given frames, then reports the camera gone
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+
+def test_paused_pipeline_drops_nothing():
+    pipeline = GesturePipeline(ListCamera(range(50)), lambda img: (img, {}))
+    pipeline.pause()
+    pipeline.start()
+    pipeline.threads[0].join(timeout=5)
+    pipeline.stop()
+    assert pipeline.dropped == {'capture': 0, 'inference': 0}
+
+
+def test_resume_discards_frames_from_before_the_pause():
+    pipeline = GesturePipeline(ListCamera([]), lambda img: (img, {}))
+    pipeline.frames.put('stale')
+    pipeline.pause()
+    pipeline.resume()
+    assert pipeline.frames.get(timeout=0) is None
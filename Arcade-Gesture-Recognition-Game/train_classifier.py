@@ -0,0 +1,64 @@
+import argparse
+
+import numpy as np
+
+from classifier import CLASSIFIERS, KNNClassifier, MLPClassifier, NearestCentroidClassifier
+from landmark_log import HANDEDNESS_LABELS, open_recording, pixel_landmarks
+
+
+def load_samples(labelled_paths):
+    # "Gesture=recording.lmk" pairs -> first-hand landmarks, labels and handedness for every
+    # frame with a hand in view
+    landmarks, labels, handedness = [], [], []
+    for item in labelled_paths:
+        label, sep, path = item.partition('=')
+        if not sep:
+            raise SystemExit(f"expected GESTURE=PATH, got {item!r}")
+        header, records = open_recording(path)
+        with_hand = records[records['hands'] > 0]
+        landmarks.append(pixel_landmarks(header, with_hand)[:, 0])
+        labels += [label] * len(with_hand)
+        handedness += [HANDEDNESS_LABELS.get(code) for code in with_hand['handedness'][:, 0].tolist()]
+        print(f"{label}: {len(with_hand)} frames from {path}")
+    return np.concatenate(landmarks), np.array(labels), handedness
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train a landmark gesture classifier from labelled .lmk recordings')
+    parser.add_argument('recordings', nargs='+', metavar='GESTURE=PATH',
+                        help='a gesture name and a recording of that gesture being held, e.g. Fist=fist.lmk')
+    parser.add_argument('--model', choices=sorted(CLASSIFIERS), default='mlp')
+    parser.add_argument('--out', default='gesture_model.npz')
+    parser.add_argument('--k', type=int, default=5, help='neighbours for the knn model')
+    parser.add_argument('--hidden', type=int, default=32, help='hidden units for the mlp model')
+    parser.add_argument('--epochs', type=int, default=500, help='training steps for the mlp model')
+    parser.add_argument('--holdout', type=float, default=0.2, help='share of frames kept back for evaluation')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    landmarks, labels, handedness = load_samples(args.recordings)
+    order = np.random.default_rng(args.seed).permutation(len(labels))
+    split = int(len(order) * (1 - args.holdout))
+    train, test = order[:split], order[split:]
+
+    if args.model == 'knn':
+        model = KNNClassifier(k=args.k)
+    elif args.model == 'mlp':
+        model = MLPClassifier(hidden=args.hidden, epochs=args.epochs, seed=args.seed)
+    else:
+        model = NearestCentroidClassifier()
+    model.fit(landmarks[train], labels[train], [handedness[i] for i in train])
+
+    if len(test):
+        predicted = model.predict(landmarks[test], [handedness[i] for i in test])
+        print(f"Held-out accuracy: {np.mean(predicted == labels[test]):.1%} on {len(test)} frames")
+        for label in model.classes:
+            mask = labels[test] == label
+            if mask.any():
+                print(f"  {label:<20} {np.mean(predicted[mask] == label):.1%}")
+    model.save(args.out)
+    print(f"Saved {args.model} model for {len(model.classes)} gestures to {args.out}")
+
+
+if __name__ == '__main__':
+    main()